@@ -1,9 +1,21 @@
 from rtree import index
 import matplotlib.pyplot as plt
+import numpy as np
+import collections
+import heapq
+import itertools
+import multiprocessing
+import os
 import random
+import struct
+import tempfile
 import math
+import time
+import zlib
 
 class MovingObject:
+    __slots__ = ("object_id", "x", "y", "start_time", "end_time")      # No per-instance __dict__
+
     def __init__(self, object_id, x, y, start_time, end_time): #constructor
         self.object_id = object_id      # Unique identifier for the object
         self.x = x                      # X coordinate of the object
@@ -11,47 +23,268 @@ class MovingObject:
         self.start_time = start_time    # Start time of the object trajectory
         self.end_time = end_time        # End time of the object trajectory
 
-p = index.Property()                    # Create a new property object
-p.dimension = 3                         # Use 3D for spatial dimensions plus time  
-idx = index.Index(properties=p)         # Create a new index
+class MovingObjectView:                 # Read-only view of one row of a TrajectoryStore
+    __slots__ = ("store", "row")
 
-num_objects = 200                       # Number of moving objects
-moving_objects = []                     # List of moving objects
-
-for i in range(num_objects):            # Generate random moving objects
-    object_id = i                       # Unique identifier for the object
-    x = random.uniform(0, 100)          # X coordinate of the object
-    y = random.uniform(0, 100)          # Y coordinate of the object
-    start_time = random.uniform(0, 100)             # Start time of the object trajectory
-    end_time = start_time + random.uniform(0, 10)   # End time of the object trajectory
-    moving_objects.append(MovingObject(object_id, x, y, start_time, end_time))          # Create a new moving object
-    idx.insert(                 # Insert the object into the index
-        object_id,
-        (x, y, start_time, x, y, end_time)
+    def __init__(self, store, row):
+        self.store = store              # Store holding the columns
+        self.row = row                  # Row of the object in the store
+
+    @property
+    def object_id(self):
+        return int(self.store.object_ids[self.row])
+
+    @property
+    def x(self):
+        return float(self.store.xs[self.row])
+
+    @property
+    def y(self):
+        return float(self.store.ys[self.row])
+
+    @property
+    def start_time(self):
+        return float(self.store.start_times[self.row])
+
+    @property
+    def end_time(self):
+        return float(self.store.end_times[self.row])
+
+class TrajectoryStore:                  # Struct-of-arrays storage for moving objects
+    # One NumPy column per attribute, 40 bytes per object. Row i holds the object the index
+    # knows under id i, so candidate ids from idx can be used directly as row numbers.
+    def __init__(self, capacity=1024):
+        self.size = 0                                               # Number of stored objects
+        self.object_ids = np.empty(capacity, dtype=np.int64)        # Unique identifiers
+        self.xs = np.empty(capacity, dtype=np.float64)              # X coordinates
+        self.ys = np.empty(capacity, dtype=np.float64)              # Y coordinates
+        self.start_times = np.empty(capacity, dtype=np.float64)     # Start times of the trajectories
+        self.end_times = np.empty(capacity, dtype=np.float64)       # End times of the trajectories
+
+    @classmethod
+    def from_arrays(cls, object_ids, xs, ys, start_times, end_times):      # Wrap existing columns
+        store = cls(0)
+        store.object_ids = np.ascontiguousarray(object_ids, dtype=np.int64)
+        store.xs = np.ascontiguousarray(xs, dtype=np.float64)
+        store.ys = np.ascontiguousarray(ys, dtype=np.float64)
+        store.start_times = np.ascontiguousarray(start_times, dtype=np.float64)
+        store.end_times = np.ascontiguousarray(end_times, dtype=np.float64)
+        store.size = len(store.object_ids)
+        return store
+
+    def append(self, object_id, x, y, start_time, end_time):       # Add one object, growing the columns when full
+        if self.size == len(self.object_ids):
+            capacity = max(2 * self.size, 16)                       # Amortized O(1) appends
+            for name in ("object_ids", "xs", "ys", "start_times", "end_times"):
+                column = getattr(self, name)
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:self.size] = column[:self.size]
+                setattr(self, name, grown)
+        row = self.size
+        self.object_ids[row] = object_id
+        self.xs[row] = x
+        self.ys[row] = y
+        self.start_times[row] = start_time
+        self.end_times[row] = end_time
+        self.size += 1
+        return row
+
+    def columns(self):                  # (ids, xs, ys, start_times, end_times) trimmed to the stored rows
+        return (self.object_ids[:self.size], self.xs[:self.size], self.ys[:self.size],
+                self.start_times[:self.size], self.end_times[:self.size])
+
+    @property
+    def nbytes(self):                   # Memory used by the stored rows
+        return sum(column.nbytes for column in self.columns())
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, row):
+        if not -self.size <= row < self.size:
+            raise IndexError("trajectory store index out of range")
+        return MovingObjectView(self, row % self.size)
+
+    def __iter__(self):
+        return (MovingObjectView(self, row) for row in range(self.size))
+
+def index_properties():                 # Properties of a 3D (x, y, t) index
+    p = index.Property()                # Create a new property object
+    p.dimension = 3                     # Use 3D for spatial dimensions plus time
+    return p
+
+def bulk_load_index(records, fill_factor=0.9):     # Build a packed 3D index in one pass
+    # records is an iterable of (object_id, x, y, start_time, end_time) tuples; columns go
+    # through bulk_load_columns(). Both hand the whole data set to libspatialindex, which
+    # sorts it once and packs the leaves with Sort-Tile-Recursive up to fill_factor instead
+    # of splitting nodes one insert at a time.
+    p = index_properties()
+    p.fill_factor = fill_factor                                     # Target occupancy of the packed nodes
+    records = iter(records)
+    first = next(records, None)                                     # The STR loader rejects an empty stream
+    if first is None:
+        return index.Index(properties=p)
+    stream = (
+        (object_id, (x, y, start_time, x, y, end_time), None)      # Degenerate box spanning the lifetime
+        for object_id, x, y, start_time, end_time in itertools.chain([first], records)
     )
+    return index.Index(stream, properties=p)
 
-def nearest_neighbor_query(query_x, query_y, query_time):           # Nearest neighbor query
-    query_range = 5  # Adjust this value based on your desired query range
+def bulk_load_columns(ids, xs, ys, start_times, end_times, fill_factor=0.9):  # bulk_load_index() from NumPy columns
+    columns = [np.asarray(column) for column in (ids, xs, ys, start_times, end_times)]
+    if any(column.ndim != 1 or len(column) != len(columns[0]) for column in columns):
+        raise ValueError(f"columns must be 1-D arrays of equal length, got shapes {[column.shape for column in columns]}")
+    ids, xs, ys, start_times, end_times = columns
+    p = index_properties()
+    p.fill_factor = fill_factor                                     # Target occupancy of the packed nodes
+    if len(ids) == 0:                                               # Nothing to pack
+        return index.Index(properties=p)
+    mins = np.column_stack((xs, ys, start_times)).astype(np.float64)          # Lower corners of the boxes
+    maxs = np.column_stack((xs, ys, end_times)).astype(np.float64)            # Upper corners of the boxes
+    return index.Index((ids.astype(np.int64), mins, maxs), properties=p)
+
+def incremental_load_index(records):    # Build a 3D index by inserting one object at a time
+    rtree_index = index.Index(properties=index_properties())       # Create a new index
+    for object_id, x, y, start_time, end_time in records:
+        rtree_index.insert(object_id, (x, y, start_time, x, y, end_time))     # Insert the object into the index
+    return rtree_index
+
+def node_fill(rtree_index):             # Number of leaves and average leaf occupancy of an index
+    leaves = rtree_index.leaves()                                   # (node id, child ids, bounds) per leaf
+    if not leaves:
+        return 0, 0.0
+    capacity = rtree_index.properties.leaf_capacity                 # Maximum entries per leaf
+    entries = sum(len(child_ids) for _, child_ids, _ in leaves)     # Entries stored in the leaves
+    return len(leaves), entries / (len(leaves) * capacity)
+
+def build_report(sizes):                # Compare incremental and bulk-loaded construction
+    print("Objects     Incremental (s)  Leaves  Fill    Bulk (s)  Leaves  Fill")
+    for size in sizes:
+        records = [
+            (i, random.uniform(0, 100), random.uniform(0, 100), start_time, start_time + random.uniform(0, 10))
+            for i, start_time in enumerate(random.uniform(0, 100) for _ in range(size))
+        ]
+
+        start = time.perf_counter()
+        incremental = incremental_load_index(records)              # One insert per object
+        incremental_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bulk = bulk_load_index(records)                             # Sort-Tile-Recursive packing
+        bulk_time = time.perf_counter() - start
 
-    # Calculate a tighter bounding box based on the query range
-    x_min = query_x - query_range   # Minimum x value
-    x_max = query_x + query_range   # Maximum x value
-    y_min = query_y - query_range   # Minimum y value
-    y_max = query_y + query_range   # Maximum y value
-    time_min = query_time           # Minimum time value
-    time_max = query_time           # Maximum time value
+        incremental_leaves, incremental_fill = node_fill(incremental)
+        bulk_leaves, bulk_fill = node_fill(bulk)
+        print(f"{size:<11} {incremental_time:<16.4f} {incremental_leaves:<7} {incremental_fill:<7.1%} "
+              f"{bulk_time:<9.4f} {bulk_leaves:<7} {bulk_fill:.1%}")
 
-    best_distance = float('inf')    # Initialize the best distance variable
-    nearest_object = None           # Initialize the nearest object variable
+COLUMNS_MAGIC = b"TRAJCOLS"             # First bytes of a saved attribute column file
+COLUMNS_VERSION = 1                     # Layout version of the column file
+COLUMNS_HEADER = struct.Struct("<8sIQI")                            # Magic, version, object count, CRC-32 of the columns
+COLUMNS_OFFSET = 64                     # Columns start after the header, padded for alignment
 
-    for obj_id in idx.intersection((x_min, y_min, time_min, x_max, y_max, time_max)):       # Iterate through all objects in the index
-        obj = moving_objects[obj_id]                                            # Get the object from the list of moving objects
-        distance = math.sqrt((query_x - obj.x)**2 + (query_y - obj.y)**2)       # Calculate the distance between the query point and the object
-        if distance < best_distance:        # If the distance is better than the previous best distance
-            best_distance = distance        # Update the best distance
-            nearest_object = obj            # Update the nearest object 
+def save_trajectory_index(path, store=None):        # Write the index and the attribute columns to disk
+    # The R-tree is packed from the store into rtree's file storage (path.idx / path.dat) and
+    # the columns go to path.cols behind a versioned header, so open_trajectory_index() can
+    # map both back without rebuilding anything. Defaults to the module's active store.
+    store = moving_objects if store is None else store
+    columns = store.columns()
 
-    return nearest_object                   # Return the nearest object
+    for extension in ("idx", "dat"):                                # Replace an earlier save at the same path
+        if os.path.exists(f"{path}.{extension}"):
+            os.remove(f"{path}.{extension}")
+    p = index_properties()
+    if len(store):
+        _, xs, ys, start_times, end_times = columns
+        rows = np.arange(len(store), dtype=np.int64)                # Index ids are store rows, not object ids
+        disk_index = index.Index(path, (rows, np.column_stack((xs, ys, start_times)), np.column_stack((xs, ys, end_times))), properties=p)
+    else:                               # The bulk loader rejects an empty data set
+        disk_index = index.Index(path, properties=p)
+    disk_index.close()                  # Flush the tree to disk
+
+    checksum = 0
+    for column in columns:
+        checksum = zlib.crc32(column.tobytes(), checksum)
+    with open(f"{path}.cols", "wb") as columns_file:
+        columns_file.write(COLUMNS_HEADER.pack(COLUMNS_MAGIC, COLUMNS_VERSION, len(store), checksum).ljust(COLUMNS_OFFSET, b"\0"))
+        for column in columns:
+            columns_file.write(column.tobytes())
+
+def open_trajectory_index(path, verify=False):     # Reopen a saved index without rebuilding it
+    # Returns (rtree_index, store). The tree is read from its files on demand and the columns
+    # are memory-mapped, so only the pages touched by queries are read. verify=True also
+    # checks the CRC-32 of the columns, which reads the whole file.
+    with open(f"{path}.cols", "rb") as columns_file:
+        header = columns_file.read(COLUMNS_HEADER.size)
+    if len(header) < COLUMNS_HEADER.size:
+        raise ValueError(f"{path}.cols is not a trajectory column file")
+    magic, version, count, checksum = COLUMNS_HEADER.unpack(header)
+    if magic != COLUMNS_MAGIC:
+        raise ValueError(f"{path}.cols is not a trajectory column file")
+    if version != COLUMNS_VERSION:
+        raise ValueError(f"{path}.cols has layout version {version}, expected {COLUMNS_VERSION}")
+
+    columns = []
+    for position, dtype in enumerate((np.int64, np.float64, np.float64, np.float64, np.float64)):
+        offset = COLUMNS_OFFSET + position * count * 8              # Every column is count 8-byte values
+        columns.append(np.memmap(f"{path}.cols", dtype=dtype, mode="r", offset=offset, shape=(count,)) if count else np.zeros(0, dtype=dtype))
+    if verify:
+        computed = 0
+        for column in columns:
+            computed = zlib.crc32(column.tobytes(), computed)
+        if computed != checksum:
+            raise ValueError(f"{path}.cols is corrupted (checksum mismatch)")
+
+    rtree_index = index.Index(path, properties=index_properties())  # Existing files are opened, not overwritten
+    entries = len(rtree_index)                                      # A tree from another save does not fit the columns
+    if entries != count:
+        rtree_index.close()
+        raise ValueError(f"{path}.idx holds {entries} entries but {path}.cols holds {count} objects")
+    return rtree_index, TrajectoryStore.from_arrays(*columns)
+
+def use_trajectory_index(rtree_index, store):   # Make an index the one the query functions use
+    global idx, moving_objects
+    idx = rtree_index
+    moving_objects = store
+
+num_objects = 200                       # Number of moving objects
+start_times = np.random.uniform(0, 100, num_objects)               # Start times of the object trajectories
+moving_objects = TrajectoryStore.from_arrays(                       # Columnar store of moving objects
+    np.arange(num_objects),                                         # Unique identifiers of the objects
+    np.random.uniform(0, 100, num_objects),                         # X coordinates of the objects
+    np.random.uniform(0, 100, num_objects),                         # Y coordinates of the objects
+    start_times,
+    start_times + np.random.uniform(0, 10, num_objects),            # End times of the object trajectories
+)
+
+idx = bulk_load_columns(np.arange(len(moving_objects)), *moving_objects.columns()[1:])    # Pack all objects in one pass, keyed by row
+
+def nearest_alive_rows(rtree_index, store, query_x, query_y, query_time, k):     # Rows of the k nearest objects alive at query_time
+    # rtree_index.nearest() walks the tree best-first by (x, y, t) distance. An object alive
+    # at query_time has no time gap, so its 3D distance is its planar distance, and every
+    # entry that has not come out of the stream yet is at least as far away. The k-th
+    # alive object is therefore proven as soon as it is seen and the search stops there.
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    query_box = (query_x, query_y, query_time, query_x, query_y, query_time)   # Degenerate box at the query point
+    num_results = 2 * k             # Entries to pull from the best-first stream
+
+    while True:
+        candidates = np.fromiter(rtree_index.nearest(query_box, num_results), dtype=np.int64)   # Entries in increasing distance
+        alive = (store.start_times[candidates] <= query_time) & (query_time <= store.end_times[candidates])
+        nearest_rows = candidates[alive][:k]                        # Keep only objects alive at the query time
+        if len(nearest_rows) == k or len(candidates) < num_results: # The k-th distance is proven or the index is exhausted
+            return nearest_rows
+        num_results *= 2            # Too many entries alive at other times, widen the stream
+
+def knn(query_x, query_y, query_time, k):                           # k nearest neighbors alive at query_time
+    nearest_rows = nearest_alive_rows(idx, moving_objects, query_x, query_y, query_time, k)
+    return [moving_objects[obj_id] for obj_id in nearest_rows]
+
+def nearest_neighbor_query(query_x, query_y, query_time):           # Nearest neighbor query
+    nearest_objects = knn(query_x, query_y, query_time, 1)          # Best-first search for the single nearest object
+    return nearest_objects[0] if nearest_objects else None          # Return the nearest object
 
 
 
@@ -73,17 +306,230 @@ for query_x, query_y, query_time in queries:        # Iterate through all querie
 
 
     #range query
+def range_query_ids(query_x_min, query_y_min, query_z_min, query_x_max, query_y_max, query_z_max, query_time_min, query_time_max):
+    query_box = (query_x_min, query_y_min, query_z_min, query_x_max, query_y_max, query_z_max)  # Create a query box
+    candidates = np.fromiter(idx.intersection(query_box), dtype=np.int64)  # Candidate ids from the index
+
+    start_times = moving_objects.start_times[candidates]            # Gather the candidate time columns once
+    end_times = moving_objects.end_times[candidates]
+    overlaps = (                                                    # The object trajectory intersects with the query time interval
+        ((query_time_min <= start_times) & (start_times <= query_time_max)) |
+        ((query_time_min <= end_times) & (end_times <= query_time_max))
+    )
+    return candidates[overlaps]                                     # Return the ids of the matching objects
+
 def range_query(query_x_min, query_y_min, query_z_min, query_x_max, query_y_max, query_z_max, query_time_min, query_time_max):
-    result_trajectories = []    # Initialize the result trajectories list
+    result_ids = range_query_ids(query_x_min, query_y_min, query_z_min, query_x_max, query_y_max, query_z_max, query_time_min, query_time_max)
+    return [moving_objects[obj_id] for obj_id in result_ids]        # Return the result trajectories list
 
-    query_box = (query_x_min, query_y_min, query_z_min, query_x_max, query_y_max, query_z_max)  # Create a query box
+def open_worker_index(path):            # Pool initializer: open the saved index in the worker
+    use_trajectory_index(*open_trajectory_index(path))
+
+def can_fork():                         # Whether worker processes can be forked (not on Windows)
+    return "fork" in multiprocessing.get_all_start_methods()
+
+def make_query_pool(processes=None, path=None):     # Process pool for the batched queries
+    # Where workers can be forked, by default each one reads the parent's idx and
+    # moving_objects in place. With the path of a saved index every worker opens the files
+    # itself instead, which also works with spawned workers, so that is the only way
+    # elsewhere. Either way the index is never pickled into the tasks.
+    if path is None:
+        if not can_fork():
+            raise ValueError("workers cannot be forked here, pass the path of a saved index")
+        return multiprocessing.get_context("fork").Pool(processes)
+    context = multiprocessing.get_context("fork" if can_fork() else "spawn")
+    return context.Pool(processes, initializer=open_worker_index, initargs=(path,))
+
+def merge_batches(batches):             # Concatenate (offsets, ids) results of consecutive query chunks
+    offsets = [np.zeros(1, dtype=np.int64)]
+    ids = []
+    total = 0
+    for chunk_offsets, chunk_ids in batches:
+        offsets.append(chunk_offsets[1:] + total)                   # Shift past the previous chunks
+        ids.append(chunk_ids)
+        total += len(chunk_ids)
+    return np.concatenate(offsets), np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+
+def run_batched(query, arrays, pool, chunk_size, *args):       # Split a batch into chunks and answer them in the pool
+    num_chunks = max(1, -(-len(arrays[0]) // chunk_size))          # Number of chunks, rounded up
+    chunks = zip(*(np.array_split(array, num_chunks) for array in arrays))
+    return merge_batches(pool.starmap(query, (chunk + args for chunk in chunks)))
+
+def range_query_many(boxes, time_ranges, pool=None, chunk_size=1024):       # Batched range query
+    # boxes is an (n, 6) array of (x_min, y_min, z_min, x_max, y_max, z_max) and time_ranges an
+    # (n, 2) array of (time_min, time_max). The result is (offsets, ids): the ids matching
+    # query i are ids[offsets[i]:offsets[i + 1]].
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 6)
+    time_ranges = np.asarray(time_ranges, dtype=np.float64).reshape(-1, 2)
+    if pool is not None:
+        return run_batched(range_query_many, (boxes, time_ranges), pool, chunk_size)
+
+    candidates, counts = idx.intersection_v(boxes[:, :3], boxes[:, 3:])       # One index call for the whole batch
+    query_ids = np.repeat(np.arange(len(boxes)), counts.astype(np.int64))    # Query of every candidate
+    time_min = time_ranges[query_ids, 0]
+    time_max = time_ranges[query_ids, 1]
+    start_times = moving_objects.start_times[candidates]
+    end_times = moving_objects.end_times[candidates]
+    overlaps = (                                                    # Same time test as range_query_ids
+        ((time_min <= start_times) & (start_times <= time_max)) |
+        ((time_min <= end_times) & (end_times <= time_max))
+    )
+
+    offsets = np.zeros(len(boxes) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(query_ids[overlaps], minlength=len(boxes)), out=offsets[1:])
+    return offsets, candidates[overlaps].astype(np.int64)
+
+def nearest_many(points, k=1, pool=None, chunk_size=1024):     # Batched k nearest neighbors
+    # points is an (n, 3) array of (x, y, time). Every query runs the same best-first search
+    # as knn(), and queries whose k-th alive object is not proven yet are repeated with a
+    # doubled stream. The result is (offsets, ids) in increasing distance per query.
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if pool is not None:
+        return run_batched(nearest_many, (points,), pool, chunk_size, k)
+
+    results = [np.zeros(0, dtype=np.int64)] * len(points)          # Ids found for every query
+    pending = np.arange(len(points)) if k > 0 else np.zeros(0, dtype=np.int64)
+    num_results = 2 * k             # Entries to pull from the best-first stream
+
+    while len(pending):
+        query_points = points[pending]
+        candidates, counts = idx.nearest_v(query_points, query_points, num_results=num_results)
+        counts = counts.astype(np.int64)
+        query_ids = np.repeat(np.arange(len(pending)), counts)    # Position in pending of every candidate
+        query_times = query_points[query_ids, 2]
+        alive = (moving_objects.start_times[candidates] <= query_times) & (query_times <= moving_objects.end_times[candidates])
+
+        alive_ids = candidates[alive]
+        alive_queries = query_ids[alive]
+        rank = np.arange(len(alive_ids)) - np.searchsorted(alive_queries, alive_queries)    # Rank among the alive candidates of the query
+        keep = rank < k
+        alive_counts = np.bincount(alive_queries, minlength=len(pending))
+        done = (alive_counts >= k) | (counts < num_results)        # The k-th distance is proven or the index is exhausted
+
+        kept_offsets = np.zeros(len(pending) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(alive_queries[keep], minlength=len(pending)), out=kept_offsets[1:])
+        kept_ids = alive_ids[keep].astype(np.int64)
+        for position in np.flatnonzero(done):
+            results[pending[position]] = kept_ids[kept_offsets[position]:kept_offsets[position + 1]]
+
+        pending = pending[~done]
+        num_results *= 2            # Too many entries alive at other times, widen the stream
+
+    offsets = np.zeros(len(points) + 1, dtype=np.int64)
+    np.cumsum([len(ids) for ids in results], out=offsets[1:])
+    return offsets, np.concatenate(results) if results else np.zeros(0, dtype=np.int64)
+
+
+
+def insert_moving_object(object_id, x, y, start_time, end_time, cache=None):   # Add one object to the active index
+    row = moving_objects.append(object_id, x, y, start_time, end_time)
+    idx.insert(row, (x, y, start_time, x, y, end_time))            # Index ids are store rows
+    if cache is not None:
+        cache.invalidate((x, y, start_time, x, y, end_time))        # Drop the cached results the object changes
+    return row
 
-    for obj_id in idx.intersection(query_box):  # Iterate through all objects in the index
-        obj = moving_objects[obj_id]            # Get the object from the list of moving objects
-        if query_time_min <= obj.start_time <= query_time_max or query_time_min <= obj.end_time <= query_time_max:  # If the object trajectory intersects with the query time interval
-            result_trajectories.append(obj)     # Add the object to the result trajectories list
+class QueryCache:                       # LRU cache of range and nearest neighbor results
+    # Range queries are keyed on their box snapped outward to the grid and store the index
+    # candidates of the snapped box, so nearby queries on the same tiles share an entry and
+    # every call is still refined exactly. Nearest neighbor queries are keyed on the exact
+    # point and store the answer together with the box around the k-th distance. Cached
+    # boxes live in their own R-tree, so an insert drops exactly the entries it overlaps.
+    # An answer with fewer than k objects has no finite box, as any new object alive at its
+    # time changes it; those are kept apart by time and checked on every insert.
+    # Call clear() after use_trajectory_index() switches the active index.
+    def __init__(self, grid=1.0, time_grid=None, max_entries=1024):
+        self.grid = grid                                            # Spatial snapping step
+        self.time_grid = grid if time_grid is None else time_grid   # Time snapping step
+        self.max_entries = max_entries                              # Bound on the number of cached results
+        self.clear()
 
-    return result_trajectories
+    def clear(self):
+        self.entries = collections.OrderedDict()                    # Key -> (entry id, box, result), oldest first
+        self.keys = {}                                              # Entry id -> key
+        self.boxes = index.Index(properties=index_properties())     # Boxes of the cached results
+        self.unbounded = {}                                         # Key -> query time of the entries without a box
+        self.next_entry_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def snap(self, low, high, step):    # Grow [low, high] to grid lines
+        return math.floor(low / step) * step, math.ceil(high / step) * step
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)   # Most recently used
+        self.hits += 1
+        return entry[2]
+
+    def store(self, key, box, result):  # box None: invalidated by any insert alive at key's time
+        entry_id = self.next_entry_id
+        self.next_entry_id += 1
+        self.entries[key] = (entry_id, box, result)
+        self.keys[entry_id] = key
+        if box is None:                 # libspatialindex cannot hold infinite bounds
+            self.unbounded[key] = key[3]
+        else:
+            self.boxes.insert(entry_id, box)
+        if len(self.entries) > self.max_entries:                    # Evict the least recently used entry
+            self.discard(next(iter(self.entries)))
+
+    def discard(self, key):
+        entry_id, box, _ = self.entries.pop(key)
+        del self.keys[entry_id]
+        if box is None:
+            del self.unbounded[key]
+        else:
+            self.boxes.delete(entry_id, box)
+
+    def invalidate(self, box):          # Drop every entry whose box overlaps box
+        stale = [self.keys[entry_id] for entry_id in self.boxes.intersection(box)]
+        stale += [key for key, query_time in self.unbounded.items() if box[2] <= query_time <= box[5]]
+        for key in stale:
+            self.discard(key)
+            self.invalidations += 1
+
+    def range_query_ids(self, query_x_min, query_y_min, query_z_min, query_x_max, query_y_max, query_z_max, query_time_min, query_time_max):
+        x_min, x_max = self.snap(query_x_min, query_x_max, self.grid)
+        y_min, y_max = self.snap(query_y_min, query_y_max, self.grid)
+        z_min, z_max = self.snap(query_z_min, query_z_max, self.time_grid)
+        box = (x_min, y_min, z_min, x_max, y_max, z_max)            # Snapped query box
+        candidates = self.lookup(("range", box))
+        if candidates is None:
+            candidates = np.fromiter(idx.intersection(box), dtype=np.int64)
+            self.store(("range", box), box, candidates)
+
+        xs = moving_objects.xs[candidates]                          # Exact test of the unsnapped query
+        ys = moving_objects.ys[candidates]
+        start_times = moving_objects.start_times[candidates]
+        end_times = moving_objects.end_times[candidates]
+        matches = (
+            (query_x_min <= xs) & (xs <= query_x_max) & (query_y_min <= ys) & (ys <= query_y_max) &
+            (start_times <= query_z_max) & (query_z_min <= end_times) & (
+                ((query_time_min <= start_times) & (start_times <= query_time_max)) |
+                ((query_time_min <= end_times) & (end_times <= query_time_max))
+            )
+        )
+        return candidates[matches]
+
+    def range_query(self, *query):
+        return [moving_objects[obj_id] for obj_id in self.range_query_ids(*query)]
+
+    def knn(self, query_x, query_y, query_time, k):
+        key = ("knn", query_x, query_y, query_time, k)
+        nearest_rows = self.lookup(key)
+        if nearest_rows is None:
+            nearest_rows = nearest_alive_rows(idx, moving_objects, query_x, query_y, query_time, k)
+            if len(nearest_rows) == k and k > 0:    # Only objects closer than the k-th one change the answer
+                radius = math.hypot(moving_objects.xs[nearest_rows[-1]] - query_x, moving_objects.ys[nearest_rows[-1]] - query_y)
+                box = (query_x - radius, query_y - radius, query_time, query_x + radius, query_y + radius, query_time)
+            else:                       # Fewer than k objects alive: any new one changes the answer
+                box = None
+            self.store(key, box, nearest_rows)
+        return [moving_objects[obj_id] for obj_id in nearest_rows]
 
 
 
@@ -128,27 +574,419 @@ else:
     print("No trajectories found for the given query.")
 
 
-def intersection_query():               # Intersection query
-    intersecting_trajectories = []      # Initialize the intersecting trajectories list
+def join_chunks(distance, chunk_size=4096):         # Candidate pairs from the index, refined exactly
+    # An index nested-loop join: every object probes idx with its own box grown by distance
+    # in x and y, one tree search per object, batched into one intersection_v call per chunk
+    # of objects. With short probes that costs about O(n log n + k) instead of comparing all
+    # pairs. The box test already guarantees overlapping lifetimes; the exact
+    # predicate then keeps pairs whose positions are within distance. Each chunk yields the
+    # (left ids, right ids) arrays of its pairs with left < right.
+    object_ids, xs, ys, start_times, end_times = moving_objects.columns()
+    for chunk_start in range(0, len(object_ids), chunk_size):
+        rows = np.arange(chunk_start, min(chunk_start + chunk_size, len(object_ids)))
+        mins = np.column_stack((xs[rows] - distance, ys[rows] - distance, start_times[rows]))
+        maxs = np.column_stack((xs[rows] + distance, ys[rows] + distance, end_times[rows]))
+        candidates, counts = idx.intersection_v(mins, maxs)        # One index probe per object of the chunk
+        left = np.repeat(rows, counts.astype(np.int64))
+        right = candidates.astype(np.int64)
+
+        keep = left < right                                         # Report each pair once and skip self matches
+        left, right = left[keep], right[keep]
+        close = (xs[left] - xs[right]) ** 2 + (ys[left] - ys[right]) ** 2 <= distance ** 2
+        yield left[close], right[close]
+
+def spatiotemporal_join(distance=1.0):  # Stream the pairs of objects that meet
+    for left, right in join_chunks(distance):
+        for i, j in zip(left, right):
+            yield moving_objects[i], moving_objects[j]
+
+def spatiotemporal_join_count(distance=1.0):        # Number of pairs of objects that meet
+    return sum(len(left) for left, _ in join_chunks(distance))
+
+def intersection_query(distance=1.0):   # Intersection query
+    # Two trajectories intersect when their lifetimes overlap and their positions are at most
+    # distance apart.
+    return list(spatiotemporal_join(distance))      # Return the intersecting trajectories list
+
+class Trajectory:                       # Piecewise-linear trajectory of one object
+    __slots__ = ("object_id", "xs", "ys", "ts")
+
+    def __init__(self, object_id, xs, ys, ts):
+        self.object_id = object_id                                  # Unique identifier for the object
+        self.xs = np.asarray(xs, dtype=np.float64)                  # X coordinates of the samples
+        self.ys = np.asarray(ys, dtype=np.float64)                  # Y coordinates of the samples
+        self.ts = np.asarray(ts, dtype=np.float64)                  # Increasing sample times
+
+def box_volume(xs, ys, ts):             # Volume of the (x, y, t) box around a run of samples
+    return (xs.max() - xs.min()) * (ys.max() - ys.min()) * (ts[-1] - ts[0])
+
+def split_fixed(xs, ys, ts, pieces_per_box=8):      # Cut after every pieces_per_box linear pieces
+    num_pieces = max(len(ts) - 1, 1)
+    return list(range(0, num_pieces, pieces_per_box)) + [num_pieces]
+
+def split_volume(xs, ys, ts, max_volume=1.0):       # Grow each box until its volume would exceed max_volume
+    num_pieces = max(len(ts) - 1, 1)
+    cuts = [0]
+    while cuts[-1] < num_pieces:
+        first = cuts[-1]
+        last = first + 1                                            # Every box holds at least one piece
+        while last < num_pieces and box_volume(xs[first:last + 2], ys[first:last + 2], ts[first:last + 2]) <= max_volume:
+            last += 1
+        cuts.append(last)
+    return cuts
+
+def split_optimal(xs, ys, ts, box_cost=1.0):        # Minimize total box volume plus box_cost per box
+    # best[j] is the cheapest split of the first j pieces. For every start i the boxes of all
+    # later ends j are grown at once with running minima and maxima, so the O(m^2) dynamic
+    # program runs as m NumPy passes.
+    num_pieces = max(len(ts) - 1, 1)
+    if len(ts) < 2:
+        return [0, 1]
+    best = np.full(num_pieces + 1, np.inf)
+    best[0] = 0.0
+    previous = np.zeros(num_pieces + 1, dtype=np.int64)            # Start of the last box of the best split
+    for first in range(num_pieces):
+        x_span = np.maximum.accumulate(xs[first:]) - np.minimum.accumulate(xs[first:])
+        y_span = np.maximum.accumulate(ys[first:]) - np.minimum.accumulate(ys[first:])
+        volumes = (x_span * y_span * (ts[first:] - ts[first]))[1:]  # Box of pieces first..j for every end j
+        costs = best[first] + volumes + box_cost
+        ends = np.arange(first + 1, num_pieces + 1)
+        better = costs < best[ends]
+        best[ends[better]] = costs[better]
+        previous[ends[better]] = first
+    cuts = [num_pieces]
+    while cuts[-1] > 0:
+        cuts.append(previous[cuts[-1]])
+    return cuts[::-1]
+
+split_policies = {                      # Ways of grouping consecutive samples into one box
+    "fixed": split_fixed,
+    "volume": split_volume,
+    "optimal": split_optimal,
+}
+
+class SegmentedTrajectoryIndex:         # 3D R-tree over boxes of consecutive trajectory pieces
+    def __init__(self, trajectories, policy="fixed", **policy_options):
+        self.trajectories = list(trajectories)
+        lengths = np.array([len(trajectory.ts) for trajectory in self.trajectories], dtype=np.int64)
+        sample_offsets = np.concatenate(([0], np.cumsum(lengths)))    # First sample of every trajectory
+        self.xs = np.concatenate([trajectory.xs for trajectory in self.trajectories])
+        self.ys = np.concatenate([trajectory.ys for trajectory in self.trajectories])
+        self.ts = np.concatenate([trajectory.ts for trajectory in self.trajectories])
+
+        piece_starts = []               # First sample of every linear piece
+        segment_starts = []             # First piece of every box
+        split = split_policies[policy]
+        for position, trajectory in enumerate(self.trajectories):
+            first_piece = len(piece_starts)
+            offset = sample_offsets[position]
+            piece_starts.extend(range(offset, offset + max(lengths[position] - 1, 1)))
+            cuts = split(trajectory.xs, trajectory.ys, trajectory.ts, **policy_options)
+            segment_starts.extend(first_piece + cut for cut in cuts[:-1])
+        self.piece_starts = np.array(piece_starts, dtype=np.int64)
+        self.piece_ends = np.minimum(self.piece_starts + 1, np.repeat(sample_offsets[1:] - 1, np.maximum(lengths - 1, 1)))
+        self.piece_objects = np.repeat([trajectory.object_id for trajectory in self.trajectories], np.maximum(lengths - 1, 1))
+        self.segment_starts = np.array(segment_starts, dtype=np.int64)
+        self.segment_ends = np.append(self.segment_starts[1:], len(self.piece_starts))    # One past the last piece of every box
+
+        first_samples = self.piece_starts[self.segment_starts]      # Boxes of consecutive pieces share their end samples
+        last_samples = self.piece_ends[self.segment_ends - 1]
+        mins = np.column_stack([
+            np.minimum(np.minimum.reduceat(column, first_samples), column[last_samples]) for column in (self.xs, self.ys, self.ts)
+        ])
+        maxs = np.column_stack([
+            np.maximum(np.maximum.reduceat(column, first_samples), column[last_samples]) for column in (self.xs, self.ys, self.ts)
+        ])
+        self.index = index.Index((np.arange(len(self.segment_starts)), mins, maxs), properties=index_properties())
+
+        self.queries = 0                # Instrumentation of the index size / precision trade-off
+        self.candidate_boxes = 0
+        self.candidate_pieces = 0
+        self.result_pieces = 0
+
+    def query(self, x_min, y_min, time_min, x_max, y_max, time_max):   # Exact pieces of trajectories inside a box
+        # Returns (object_id, enter_time, exit_time) for every maximal stretch of a trajectory
+        # that lies inside the (x, y, t) box. The boxes from the index only select candidate
+        # pieces; each piece is then clipped against the box exactly (Liang-Barsky).
+        boxes = np.fromiter(self.index.intersection((x_min, y_min, time_min, x_max, y_max, time_max)), dtype=np.int64)
+        boxes.sort()
+        counts = self.segment_ends[boxes] - self.segment_starts[boxes]
+        pieces = np.arange(counts.sum()) + np.repeat(self.segment_starts[boxes] - np.cumsum(counts) + counts, counts)
+
+        starts = self.piece_starts[pieces]
+        ends = self.piece_ends[pieces]
+        enter = np.zeros(len(pieces))   # Fraction of the piece where it enters the box
+        exit = np.ones(len(pieces))     # Fraction of the piece where it leaves the box
+        inside = np.ones(len(pieces), dtype=bool)
+        for column, low, high in ((self.xs, x_min, x_max), (self.ys, y_min, y_max), (self.ts, time_min, time_max)):
+            origin = column[starts]
+            delta = column[ends] - origin
+            moving = delta != 0
+            inside &= moving | ((low <= origin) & (origin <= high))  # A constant coordinate must already be in range
+            with np.errstate(divide="ignore", invalid="ignore"):
+                to_low = (low - origin) / delta
+                to_high = (high - origin) / delta
+            enter = np.where(moving, np.maximum(enter, np.minimum(to_low, to_high)), enter)
+            exit = np.where(moving, np.minimum(exit, np.maximum(to_low, to_high)), exit)
+        inside &= enter <= exit
+
+        pieces, starts, ends = pieces[inside], starts[inside], ends[inside]
+        enter_times = self.ts[starts] + enter[inside] * (self.ts[ends] - self.ts[starts])
+        exit_times = self.ts[starts] + exit[inside] * (self.ts[ends] - self.ts[starts])
+        run_starts = np.ones(len(pieces), dtype=bool)               # Glue pieces that continue each other
+        run_starts[1:] = ~((pieces[1:] == pieces[:-1] + 1) & (enter_times[1:] == exit_times[:-1]) &
+                           (self.piece_objects[pieces[1:]] == self.piece_objects[pieces[:-1]]))
+        first_pieces = np.flatnonzero(run_starts)
+        last_pieces = np.append(first_pieces[1:], len(pieces)) - 1
+
+        self.queries += 1
+        self.candidate_boxes += len(boxes)
+        self.candidate_pieces += int(counts.sum())
+        self.result_pieces += len(first_pieces)
+        return [
+            (int(self.piece_objects[pieces[first]]), float(enter_times[first]), float(exit_times[last]))
+            for first, last in zip(first_pieces, last_pieces)
+        ]
+
+def segmentation_report(trajectories, policies, query_boxes):      # Index size against candidates per query
+    print("Policy                    Boxes   Candidates/query  Pieces tested/query  Results/query")
+    for name, policy, options in policies:
+        segmented = SegmentedTrajectoryIndex(trajectories, policy, **options)
+        for query_box in query_boxes:
+            segmented.query(*query_box)
+        print(f"{name:<25} {len(segmented.segment_starts):<7} {segmented.candidate_boxes / segmented.queries:<17.1f} "
+              f"{segmented.candidate_pieces / segmented.queries:<20.1f} {segmented.result_pieces / segmented.queries:.1f}")
+
+def segment_distances(xs, ys, x0, y0, x1, y1):    # Distance from each point to the segment (x0, y0)-(x1, y1)
+    dx, dy = x1 - x0, y1 - y0
+    length2 = dx * dx + dy * dy
+    along = np.clip(((xs - x0) * dx + (ys - y0) * dy) / length2, 0, 1) if length2 > 0 else 0.0
+    return np.hypot(xs - (x0 + along * dx), ys - (y0 + along * dy))
+
+def kinetic_knn_piece(rows, query_x, query_y, velocity_x, velocity_y, piece_start, piece_end, k):
+    # Kinetic top-k over the objects at rows along one linear piece of the query. With s the
+    # time since piece_start, the squared distance to an object is a + b s + |v|^2 s^2, and
+    # the shared |v|^2 s^2 term does not change the order, so objects are ranked by the
+    # lines a + b s. Only the k lines of the answer are kept in order. The sweep jumps to the
+    # next time two neighbours in the answer cross, an outsider overtakes the k-th, or an
+    # object appears or disappears; only the last two look at the outsiders, in one NumPy
+    # pass each. Returns (stretches, farthest) with farthest the largest k-th distance seen,
+    # or inf if the answer ever had fewer than k objects.
+    offsets_x = moving_objects.xs[rows] - query_x
+    offsets_y = moving_objects.ys[rows] - query_y
+    intercepts = offsets_x ** 2 + offsets_y ** 2                    # Squared distance at the start of the piece
+    slopes = -2 * (velocity_x * offsets_x + velocity_y * offsets_y)
+    speed2 = velocity_x ** 2 + velocity_y ** 2
+    length = piece_end - piece_start
+    object_ids = moving_objects.object_ids[rows]
+    a, b, ids = intercepts.tolist(), slopes.tolist(), object_ids.tolist()
+    tolerance = 1e-12 * max(1.0, float(np.abs(intercepts).max(initial=0) + np.abs(slopes).max(initial=0) * length))
+    rank = lambda i, s: (round((a[i] + b[i] * s) / tolerance), b[i], ids[i])    # Ties go to the line that stays lower
 
-    for i in range(len(moving_objects)):                    # Iterate through all objects in the list
-        for j in range(i + 1, len(moving_objects)):         # Iterate through all objects after the current object
-            obj1 = moving_objects[i]                        # Get the first object
-            obj2 = moving_objects[j]                        # Get the second object    
+    start_times = moving_objects.start_times[rows] - piece_start
+    end_times = moving_objects.end_times[rows] - piece_start
+    alive = (start_times <= 0) & (end_times > 0)
+    in_top = np.zeros(len(rows), dtype=bool)
+    first = np.flatnonzero(alive)
+    top = first[np.lexsort((object_ids[first], slopes[first], np.rint(intercepts[first] / tolerance)))[:k]].tolist()
+    in_top[top] = True
 
-            if (
-                obj1.start_time <= obj2.end_time and         # If the trajectories intersect
-                obj1.end_time >= obj2.start_time and         
-                obj1.x <= obj2.x and obj1.y <= obj2.y and    
-                obj1.x + (obj1.end_time - obj1.start_time) * (obj2.x - obj1.x) / (obj2.end_time - obj2.start_time) >= obj2.x and # 
-                obj1.y + (obj1.end_time - obj1.start_time) * (obj2.y - obj1.y) / (obj2.end_time - obj2.start_time) >= obj2.y       
-            ):
-                intersecting_trajectories.append((obj1, obj2))      # Add the intersecting trajectories to the list
+    ends = np.flatnonzero((end_times > 0) & (end_times < length))    # Objects that disappear inside the piece
+    starts = np.flatnonzero((start_times > 0) & (start_times < length) & (end_times > start_times))
+    event_times = np.concatenate((end_times[ends], start_times[starts]))
+    event_kinds = np.concatenate((np.zeros(len(ends), dtype=np.int64), np.ones(len(starts), dtype=np.int64)))
+    event_rows = np.concatenate((ends, starts))
+    order = np.lexsort((event_kinds, event_times))                  # Disappearances first at equal times
+    events = list(zip(event_times[order].tolist(), event_kinds[order].tolist(), event_rows[order].tolist()))
+    events.append((math.inf, 0, -1))
 
-    return intersecting_trajectories
+    def next_overtake(s):               # Earliest time an alive outsider crosses below the k-th line
+        if len(top) < k:
+            return math.inf, -1
+        kth = top[-1]
+        outsiders = np.flatnonzero(alive & ~in_top & (slopes < b[kth]))
+        if not len(outsiders):
+            return math.inf, -1
+        crossings = (intercepts[outsiders] - a[kth]) / (b[kth] - slopes[outsiders])
+        best = int(np.argmin(crossings))
+        return max(float(crossings[best]), s), int(outsiders[best])
+
+    stretches, farthest = [], 0.0
+    s, event = 0.0, 0
+    overtake = next_overtake(s)
+    while True:
+        swap_time, swap_at = math.inf, -1
+        for position in range(len(top) - 1):                        # Neighbours in the answer that change places
+            lower, upper = top[position], top[position + 1]
+            if b[lower] > b[upper]:
+                crossing = max((a[upper] - a[lower]) / (b[lower] - b[upper]), s)
+                if crossing < swap_time:
+                    swap_time, swap_at = crossing, position
+        event_time = events[event][0]
+        next_s = min(swap_time, overtake[0], event_time, length)
+        stretches.append((piece_start + s, piece_start + next_s, tuple(ids[i] for i in top)))
+        if len(top) < k:
+            farthest = math.inf
+        else:
+            kth = top[-1]
+            farthest = max(farthest, *(math.sqrt(max(a[kth] + b[kth] * t + speed2 * t * t, 0.0)) for t in (s, next_s)))
+        if next_s >= length:
+            return stretches, farthest
+        s = next_s
+
+        if event_time == s:                                         # Objects appear or disappear
+            while events[event][0] == s:
+                _, kind, i = events[event]
+                event += 1
+                if kind == 0:
+                    alive[i] = False
+                    if in_top[i]:
+                        top.remove(i)
+                        in_top[i] = False
+                        outsiders = np.flatnonzero(alive & ~in_top)
+                        if len(outsiders):                          # The best outsider is behind the whole answer
+                            values = np.rint((intercepts[outsiders] + slopes[outsiders] * s) / tolerance)
+                            best = int(outsiders[np.lexsort((object_ids[outsiders], slopes[outsiders], values))[0]])
+                            top.append(best)
+                            in_top[best] = True
+                else:
+                    alive[i] = True
+                    if len(top) < k or rank(i, s) < rank(top[-1], s):
+                        position = len(top)
+                        while position and rank(i, s) < rank(top[position - 1], s):
+                            position -= 1
+                        top.insert(position, i)
+                        in_top[i] = True
+                        if len(top) > k:
+                            in_top[top.pop()] = False
+            overtake = next_overtake(s)
+        elif swap_time == s:                                        # Two lines of the answer cross
+            top[swap_at], top[swap_at + 1] = top[swap_at + 1], top[swap_at]
+            if swap_at == len(top) - 2:
+                overtake = next_overtake(s)
+        else:                                                       # An outsider overtakes the k-th
+            in_top[top[-1]] = False
+            top[-1] = overtake[1]
+            in_top[overtake[1]] = True
+            overtake = next_overtake(s)
+
+def continuous_knn(query, k=1):         # k nearest neighbors along a query trajectory over its whole time span
+    # query is a Trajectory; a fixed query point over [t0, t1] is Trajectory(None, [x, x], [y, y], [t0, t1]).
+    # Returns (time_from, time_to, object_ids) for every stretch of time with the same ordered
+    # answer, so the split points are where the answer changes. For every linear piece of the
+    # query the candidates are the objects alive during the piece within radius r of its
+    # segment, taken from idx. r starts at the largest k-th distance at the start, middle and
+    # end of the piece; kinetic_knn_piece sweeps the candidates, and if the k-th distance ever
+    # passes r, r grows and the piece is redone. Objects outside r can never enter the answer,
+    # so the cost follows the objects near the query, not all objects alive in the window.
+    if k <= 0:
+        return []
+    if len(query.ts) == 1:              # A single instant
+        return [(query.ts[0], query.ts[0], tuple(int(obj.object_id) for obj in knn(query.xs[0], query.ys[0], query.ts[0], k)))]
+
+    answers = []                        # (time_from, time_to, object_ids) before merging
+    bounds = idx.bounds                 # (x min, y min, t min, x max, y max, t max) of every object
+    for piece in range(len(query.ts) - 1):
+        piece_start, piece_end = query.ts[piece], query.ts[piece + 1]
+        if piece_end <= piece_start:
+            continue
+        x0, y0, x1, y1 = query.xs[piece], query.ys[piece], query.xs[piece + 1], query.ys[piece + 1]
+        if len(moving_objects) == 0:
+            answers.append((piece_start, piece_end, ()))
+            continue
+        corners_x = np.array([bounds[0], bounds[0], bounds[3], bounds[3]])
+        corners_y = np.array([bounds[1], bounds[4], bounds[1], bounds[4]])
+        reach = float(segment_distances(corners_x, corners_y, x0, y0, x1, y1).max())   # Radius that takes in every object
+
+        radius = 0.0
+        for fraction in (0.0, 0.5, 1.0):                            # Start from the k-th distance at three instants
+            sample_time = piece_start + fraction * (piece_end - piece_start)
+            sample_x, sample_y = x0 + fraction * (x1 - x0), y0 + fraction * (y1 - y0)
+            rows = nearest_alive_rows(idx, moving_objects, sample_x, sample_y, sample_time, k)
+            if len(rows) == k:
+                radius = max(radius, float(np.hypot(moving_objects.xs[rows[-1]] - sample_x, moving_objects.ys[rows[-1]] - sample_y)))
+        radius = max(radius, reach / 1024)
+
+        while True:
+            complete = radius >= reach
+            box = (min(x0, x1) - radius, min(y0, y1) - radius, piece_start, max(x0, x1) + radius, max(y0, y1) + radius, piece_end)
+            rows = np.fromiter(idx.intersection(box), dtype=np.int64)
+            if not complete:
+                rows = rows[segment_distances(moving_objects.xs[rows], moving_objects.ys[rows], x0, y0, x1, y1) <= radius]
+            stretches, farthest = kinetic_knn_piece(rows, x0, y0, (x1 - x0) / (piece_end - piece_start),
+                                                    (y1 - y0) / (piece_end - piece_start), piece_start, piece_end, k)
+            if complete or farthest <= radius:                     # Nothing outside the radius can be closer
+                break
+            radius = max(2 * radius, farthest)
+        answers.extend(stretches)
+
+    merged = []
+    for time_from, time_to, object_ids in answers:              # Glue stretches with the same answer
+        if merged and merged[-1][2] == object_ids:
+            merged[-1] = (merged[-1][0], time_to, object_ids)
+        elif time_to > time_from or not merged:
+            merged.append((time_from, time_to, object_ids))
+    return merged
+
+class TimePartitionedIndex:              # One 3D R-tree per time bucket with sliding-window eviction
+    # An object is inserted into every bucket its lifetime overlaps, with its box clipped to
+    # the bucket. Queries only visit the buckets their time range overlaps, and buckets that
+    # end before the retention window are dropped whole, so memory stays bounded while the
+    # stream runs. The window follows the latest start time, the clock of the stream, so an
+    # object predicted to live long does not push it forward.
+    def __init__(self, bucket_width, retention):
+        self.bucket_width = bucket_width            # Time span of one bucket
+        self.retention = retention                  # Time span kept behind the latest start time
+        self.buckets = {}                           # Bucket number -> (rtree index, TrajectoryStore)
+        self.bucket_heap = []                       # Numbers of the held buckets, earliest first
+        self.oldest_time = -math.inf                # Start of the retention window
+
+    def bucket_range(self, time_min, time_max):     # Numbers of the buckets overlapping [time_min, time_max]
+        return range(math.floor(time_min / self.bucket_width), math.floor(time_max / self.bucket_width) + 1)
+
+    def expired(self, bucket):          # The bucket ends before the retention window
+        return (bucket + 1) * self.bucket_width < self.oldest_time
+
+    def insert(self, object_id, x, y, start_time, end_time):
+        for bucket in self.bucket_range(start_time, end_time):
+            if self.expired(bucket):    # Late data for a bucket that was already dropped
+                continue
+            if bucket not in self.buckets:
+                self.buckets[bucket] = (index.Index(properties=index_properties()), TrajectoryStore(64))
+                heapq.heappush(self.bucket_heap, bucket)
+            rtree_index, store = self.buckets[bucket]
+            row = store.append(object_id, x, y, start_time, end_time)
+            bucket_start = bucket * self.bucket_width
+            rtree_index.insert(row, (x, y, max(start_time, bucket_start), x, y, min(end_time, bucket_start + self.bucket_width)))
+        if start_time - self.retention > self.oldest_time:
+            self.evict(start_time - self.retention)
+
+    def evict(self, oldest_time):       # Move the retention window and drop the buckets that left it
+        self.oldest_time = oldest_time
+        while self.bucket_heap and self.expired(self.bucket_heap[0]):     # As soon as the window passes a bucket's end
+            del self.buckets[heapq.heappop(self.bucket_heap)]    # The whole tree goes at once, no per-object deletes
+
+    def __len__(self):                  # Entries held over all buckets
+        return sum(len(store) for _, store in self.buckets.values())
+
+    def range_query(self, x_min, y_min, time_min, x_max, y_max, time_max):     # Ids of objects inside an (x, y, t) box
+        found = [np.zeros(0, dtype=np.int64)]
+        for bucket in self.bucket_range(time_min, time_max):
+            if bucket in self.buckets:
+                rtree_index, store = self.buckets[bucket]
+                rows = np.fromiter(rtree_index.intersection((x_min, y_min, time_min, x_max, y_max, time_max)), dtype=np.int64)
+                found.append(store.object_ids[rows])
+        return np.unique(np.concatenate(found))     # Objects spanning several buckets are reported once
+
+    def knn(self, query_x, query_y, query_time, k):     # Ids of the k nearest objects alive at query_time
+        bucket = math.floor(query_time / self.bucket_width)         # Every object alive at query_time is in this bucket
+        if bucket not in self.buckets:
+            return np.zeros(0, dtype=np.int64)
+        rtree_index, store = self.buckets[bucket]
+        return store.object_ids[nearest_alive_rows(rtree_index, store, query_x, query_y, query_time, k)]
 
 # Example intersection query
-intersection_results = intersection_query()     # Perform an intersection query
+intersection_results = intersection_query(2.0)  # Perform an intersection query for objects within 2 units
 
 if intersection_results:                        # If intersecting trajectories are found
     print("Intersecting trajectories:")
@@ -159,6 +997,130 @@ if intersection_results:                        # If intersecting trajectories a
 else:
     print("No intersecting trajectories found.")
 
+# Compare incremental and bulk-loaded index construction
+build_report([1000, 10000, 50000])
+print(f"Trajectory store: {moving_objects.nbytes / len(moving_objects):.0f} bytes per object")
+
+# Compare one call per query against the batched entry points
+batch_points = np.column_stack((                                    # Random (x, y, time) query points
+    np.random.uniform(0, 100, 10000), np.random.uniform(0, 100, 10000), np.random.uniform(0, 100, 10000)
+))
+batch_boxes = np.column_stack((batch_points[:, :2] - 5, np.zeros(10000), batch_points[:, :2] + 5, np.full(10000, 100)))
+batch_times = np.column_stack((batch_points[:, 2], batch_points[:, 2]))
+
+start = time.perf_counter()
+for box, (time_min, time_max) in zip(batch_boxes, batch_times):
+    range_query_ids(*box, time_min, time_max)
+single_range_time = time.perf_counter() - start
+start = time.perf_counter()
+range_query_many(batch_boxes, batch_times)
+batch_range_time = time.perf_counter() - start
+
+start = time.perf_counter()
+for query_x, query_y, query_time in batch_points:
+    knn(query_x, query_y, query_time, 1)
+single_nearest_time = time.perf_counter() - start
+start = time.perf_counter()
+nearest_many(batch_points, 1)
+batch_nearest_time = time.perf_counter() - start
+
+print(f"10000 range queries: {single_range_time:.4f} s one by one, {batch_range_time:.4f} s batched")
+print(f"10000 nearest neighbor queries: {single_nearest_time:.4f} s one by one, {batch_nearest_time:.4f} s batched")
+
+# Save the index and reopen it the way a restarting service would
+with tempfile.TemporaryDirectory() as directory:
+    index_path = os.path.join(directory, "trajectories")
+    save_trajectory_index(index_path)
+    start = time.perf_counter()
+    saved_index, saved_objects = open_trajectory_index(index_path)
+    print(f"Reopened {len(saved_objects)} objects from disk in {(time.perf_counter() - start) * 1000:.2f} ms")
+    saved_index.close()
+    del saved_objects                   # Release the memory-mapped columns before the files are removed
+
+if multiprocessing.cpu_count() > 1 and can_fork():     # Fan the batch out over all cores; spawned workers would rerun this script
+    with make_query_pool() as pool:
+        start = time.perf_counter()
+        range_query_many(batch_boxes, batch_times, pool=pool)
+        nearest_many(batch_points, 1, pool=pool)
+        print(f"Both batches over {multiprocessing.cpu_count()} processes: {time.perf_counter() - start:.4f} s")
+
+# Stream positions into a time-partitioned index that keeps only the last 30 time units
+streaming_index = TimePartitionedIndex(bucket_width=5.0, retention=30.0)
+print("Stream time  Buckets  Entries  Range query (ms)")
+for step in range(1, 200001):
+    now = step * 0.001                  # 1000 positions per time unit
+    streaming_index.insert(step, random.uniform(0, 100), random.uniform(0, 100), now, now + random.uniform(0, 2))
+    if step % 25000 == 0:
+        start = time.perf_counter()
+        for _ in range(100):            # Queries over the most recent 10 time units
+            streaming_index.range_query(40, 40, now - 10, 60, 60, now)
+        print(f"{now:<12.0f} {len(streaming_index.buckets):<8} {len(streaming_index):<8} {(time.perf_counter() - start) * 10:.3f}")
+
+# Replay dashboard tiles through the result cache
+result_cache = QueryCache(grid=10.0)
+dashboard_tiles = [(tile_x, tile_y, tile_time) for tile_x in range(0, 100, 20) for tile_y in range(0, 100, 20) for tile_time in (20, 60)]
+dashboard_queries = [
+    (tile_x + random.uniform(0, 1), tile_y + random.uniform(0, 1), 0, tile_x + 20, tile_y + 20, 100, tile_time, tile_time + 20)
+    for tile_x, tile_y, tile_time in random.choices(dashboard_tiles, k=20000)
+]
+start = time.perf_counter()
+for dashboard_query in dashboard_queries:
+    range_query_ids(*dashboard_query)
+uncached_time = time.perf_counter() - start
+start = time.perf_counter()
+for dashboard_query in dashboard_queries:
+    result_cache.range_query_ids(*dashboard_query)
+cached_time = time.perf_counter() - start
+print(f"20000 dashboard queries: {uncached_time:.4f} s uncached, {cached_time:.4f} s cached "
+      f"({result_cache.hits} hits, {result_cache.misses} misses)")
+for new_id in range(len(moving_objects), len(moving_objects) + 10):    # New objects invalidate only the tiles they fall into
+    new_start = random.uniform(0, 100)
+    insert_moving_object(new_id, random.uniform(0, 100), random.uniform(0, 100), new_start, new_start + random.uniform(0, 10), result_cache)
+print(f"10 inserts invalidated {result_cache.invalidations} of {len(dashboard_tiles)} cached tiles")
+
+# Cached nearest neighbors when fewer than k objects are alive, then one more object appears
+knn_times = [random.uniform(0, 100) for _ in range(300)]
+short_answers = sum(len(result_cache.knn(50, 50, knn_time, 50)) < 50 for knn_time in knn_times)
+insert_moving_object(len(moving_objects), 50.5, 50.5, knn_times[0], knn_times[0], result_cache)
+cached_ids = [obj.object_id for obj in result_cache.knn(50, 50, knn_times[0], 50)]
+print(f"{short_answers} of 300 cached 50-nearest answers had fewer than 50 objects; "
+      f"after an insert the cache agrees with the index: {cached_ids == [obj.object_id for obj in knn(50, 50, knn_times[0], 50)]}")
+
+# Follow the nearest object of a moving query over 10 time units in one query
+moving_query = Trajectory(None, [20, 80], [30, 70], [40, 50])
+start = time.perf_counter()
+continuous_answer = continuous_knn(moving_query, 1)
+continuous_time = time.perf_counter() - start
+start = time.perf_counter()
+for sample_time in np.linspace(40, 50, 500):                       # The same question as independent lookups
+    knn(np.interp(sample_time, moving_query.ts, moving_query.xs), np.interp(sample_time, moving_query.ts, moving_query.ys), sample_time, 1)
+sampled_time = time.perf_counter() - start
+print(f"Continuous nearest neighbor: {len(continuous_answer)} answers in {continuous_time:.4f} s, 500 sampled lookups in {sampled_time:.4f} s")
+for time_from, time_to, object_ids in continuous_answer:
+    print(f"    {time_from:.2f} - {time_to:.2f}: {', '.join(f'Object {object_id}' for object_id in object_ids) or 'none'}")
+
+# Trade index size against candidates per query for multi-sample trajectories
+sampled_trajectories = []
+for object_id in range(200):            # Random walks with 100 samples each
+    sample_times = np.cumsum(np.random.uniform(0.5, 1.5, 100))
+    sampled_trajectories.append(Trajectory(
+        object_id,
+        random.uniform(0, 100) + np.cumsum(np.random.normal(0, 1, 100)),
+        random.uniform(0, 100) + np.cumsum(np.random.normal(0, 1, 100)),
+        sample_times,
+    ))
+trajectory_queries = [
+    (query_x - 5, query_y - 5, query_time, query_x + 5, query_y + 5, query_time + 10)
+    for query_x, query_y, query_time in np.random.uniform(0, 100, (500, 3))
+]
+segmentation_report(sampled_trajectories, [
+    ("one box per trajectory", "fixed", {"pieces_per_box": 100}),
+    ("one box per piece", "fixed", {"pieces_per_box": 1}),
+    ("fixed, 8 pieces", "fixed", {"pieces_per_box": 8}),
+    ("volume <= 20", "volume", {"max_volume": 20.0}),
+    ("optimal, box cost 20", "optimal", {"box_cost": 20.0}),
+], trajectory_queries)
+
 
 
 
@@ -1,14 +1,120 @@
+import argparse
+import bisect
+import csv
+from fractions import Fraction
+import functools
+import itertools
+import json
 import math
 import matplotlib.pyplot as plt
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+import os
+import platform
+import signal
+import sys
+import tempfile
 import time
 import random
 
+ORIENTATION_ERROR = (3 + 16 * 2.0**-53) * 2.0**-53              #relative error bound of a float cross product (Shewchuk)
+
+def exact_orientation(p, q, r):                                 #orientation() in exact rational arithmetic
+    p, q, r = [(Fraction(point[0]), Fraction(point[1])) for point in (p, q, r)]
+    val = (q[1] - p[1]) * (r[0] - q[0]) - (q[0] - p[0]) * (r[1] - q[1])
+    if val == 0:
+        return 0
+    return 1 if val > 0 else 2
+
 def orientation(p, q, r):
     # To find orientation of ordered triplet (p, q, r).
-    val = (q[1] - p[1]) * (r[0] - q[0]) - (q[0] - p[0]) * (r[1] - q[1])     #determine whether three points are collinear, clockwise, or counterclockwise in order
-    if val == 0:        # colinear
-        return 0  # Collinear
-    return 1 if val > 0 else 2  # Clockwise is 1 or Counterclockwise  is 2
+    left = (q[1] - p[1]) * (r[0] - q[0])
+    right = (q[0] - p[0]) * (r[1] - q[1])
+    val = left - right     #determine whether three points are collinear, clockwise, or counterclockwise in order
+    if isinstance(val, int) or left == 0 and right == 0:        # exact already
+        return 0 if val == 0 else (1 if val > 0 else 2)  # Collinear is 0
+    # Rounding can only flip the sign when |val| is within the error bound. When left and right
+    # have opposite signs |left + right| is below |val|, so it can stand in for |left| + |right|.
+    bound = ORIENTATION_ERROR * (left + right)
+    if val > bound and val > -bound:
+        return 1    # Clockwise
+    if val < bound and val < -bound:
+        return 2    # Counterclockwise
+    return exact_orientation(p, q, r)       # too close to call in floats, recompute exactly
+
+def cross_products(p, q, r):                                    #(q - p) x (r - p) for (xs, ys) arrays, positive counterclockwise
+    # Float results are checked against the same error bound as orientation(), and only the
+    # few that could have the wrong sign are recomputed exactly, so every sign is exact.
+    left = (q[0] - p[0]) * (r[1] - p[1])
+    right = (q[1] - p[1]) * (r[0] - p[0])
+    values = np.asarray(left - right)
+    if values.dtype.kind == "f":
+        uncertain = np.flatnonzero(np.abs(values) < ORIENTATION_ERROR * np.abs(left + right))   #as in orientation()
+        if len(uncertain):
+            values = values.copy()
+            coordinates = [np.broadcast_to(c, values.shape).ravel()[uncertain].tolist() for c in (*p, *q, *r)]
+            for i, point in zip(uncertain.tolist(), zip(*coordinates)):
+                px, py, qx, qy, rx, ry = map(Fraction, point)
+                values.flat[i] = float((qx - px) * (ry - py) - (qy - py) * (rx - px))   #rounding keeps the exact sign
+    return values
+
+ANGLE_ERROR = 1e-14                                             #arctan2 of rounded differences is closer than this to the true angle
+
+def angular_order(points, origin):                              #points by angle around origin, nearer points first on ties
+    # Sorting uses arctan2, which is only accurate to a few units in the last place. Runs of
+    # angles closer than ANGLE_ERROR are sorted again with exact orientation() and distance
+    # comparisons, so collinear and nearly collinear points come out in their true order.
+    # Integer points take the angle of their direction divided by its gcd, so every point on
+    # one ray from origin gets the same angle and the sort already puts them by distance;
+    # a run then only needs its distinct directions compared.
+    coordinates = exact_coordinates(as_point_array(points))
+    if coordinates.dtype == np.int64:
+        dx, dy = coordinates[:, 0] - origin[0], coordinates[:, 1] - origin[1]
+        divisors = np.gcd(dx, dy)                               #0 only for origin itself, which sorts first
+        dx, dy = dx // np.maximum(divisors, 1), dy // np.maximum(divisors, 1)
+        angles = np.arctan2(dy, dx)
+        order = np.lexsort((divisors, angles))                  #along one ray the divisor grows with the distance
+        directions = list(zip(dx.tolist(), dy.tolist()))
+    else:
+        coordinates = np.array(points, dtype=np.float64).reshape(-1, 2)
+        dx, dy = coordinates[:, 0] - origin[0], coordinates[:, 1] - origin[1]
+        angles = np.arctan2(dy, dx)
+        order = np.lexsort((dx * dx + dy * dy, angles))         #by angle, then by distance
+        directions = None
+    ties = (np.flatnonzero(np.diff(angles[order]) < ANGLE_ERROR) + 1).tolist()
+    order = order.tolist()
+
+    def compare(i, j):
+        turn = orientation(origin, points[i], points[j])
+        if turn:
+            return -1 if turn == 2 else 1
+        farther = exact_distance(origin, points[i]) - exact_distance(origin, points[j])
+        return (farther > 0) - (farther < 0)
+
+    def compare_directions(a, b):                               #distinct integer directions
+        turn = a[0] * b[1] - a[1] * b[0]
+        if turn == 0:                                           #only against the (0, 0) of origin itself
+            return -1 if a == (0, 0) else 1
+        return -1 if turn > 0 else 1
+
+    for _, run in itertools.groupby(ties, key=lambda k, counter=itertools.count(): k - next(counter)):
+        run = list(run)                                         #consecutive ties: positions run[0] - 1 to run[-1]
+        start, end = run[0] - 1, run[-1] + 1
+        if directions is None:
+            order[start:end] = sorted(order[start:end], key=functools.cmp_to_key(compare))
+            continue
+        rays = {}                                               #direction: its points, nearest first
+        for i in order[start:end]:
+            rays.setdefault(directions[i], []).append(i)
+        if len(rays) > 1:
+            order[start:end] = [i for ray in sorted(rays, key=functools.cmp_to_key(compare_directions)) for i in rays[ray]]
+    return [points[i] for i in order]
+
+def exact_distance(p, q):                                       #distance() in exact rational arithmetic
+    if all(isinstance(c, int) for c in (*p, *q)):               #integer distances are exact already
+        return distance(p, q)
+    return (Fraction(q[0]) - Fraction(p[0]))**2 + (Fraction(q[1]) - Fraction(p[1]))**2
 
 def graham_scan(points):        #graham scan algorithm
     n = len(points)             #number of points
@@ -19,7 +125,7 @@ def graham_scan(points):        #graham scan algorithm
     lowest = min(points, key=lambda p: (p[1], p[0]))
     
     # Sort the points based on polar angle with respect to the lowest point
-    sorted_points = sorted(points, key=lambda p: (math.atan2(p[1] - lowest[1], p[0] - lowest[0]), p))
+    sorted_points = angular_order(points, lowest)
     
     # Consider the first three points and initialize the stack
     convex_hull = [sorted_points[0], sorted_points[1]]
@@ -42,7 +148,7 @@ def jarvis_march(points):                           #jarvis march algorithm
     
     hull = []                                       #initialize hull
     
-    leftmost = min(points, key=lambda p: p[0])      #find the leftmost point
+    leftmost = min(points, key=lambda p: (p[0], p[1]))      #find the leftmost point, the lowest one on ties so it is a hull point
     hull.append(leftmost)                           #append the leftmost point
     
     current = leftmost                              #current point is the leftmost point
@@ -68,8 +174,8 @@ def quickhull(points):                      #quickhull algorithm
     if len(points) <= 3:                    #if less than 3 points
         return points           
     
-    leftmost = min(points, key=lambda p: p[0])          #find the leftmost point
-    rightmost = max(points, key=lambda p: p[0])         #find the rightmost point
+    leftmost = min(points, key=lambda p: (p[0], p[1]))          #find the leftmost point, the lowest one on ties
+    rightmost = max(points, key=lambda p: (p[0], p[1]))         #find the rightmost point, the highest one on ties
     convex_hull = [leftmost, rightmost]                 #initialize the convex hull
     
     points_above = [p for p in points if orientation(leftmost, rightmost, p) == 1]          #find the points above the line
@@ -78,7 +184,7 @@ def quickhull(points):                      #quickhull algorithm
     quickhull_recursive(convex_hull, points_above, leftmost, rightmost)        #call the recursive function for the points above the line
     quickhull_recursive(convex_hull, points_below, rightmost, leftmost)        #call the recursive function for the points below the line
     
-    return convex_hull
+    return convex_vertices(convex_hull, 2)              #drop farthest points that rounding picked from inside the hull
 
 def quickhull_recursive(convex_hull, points, p1, p2):           #recursive function for quickhull
     if not points:                                              #if there are no points return
@@ -88,14 +194,779 @@ def quickhull_recursive(convex_hull, points, p1, p2):           #recursive funct
     convex_hull.insert(convex_hull.index(p2), farthest)                         #insert the farthest point to the convex hull
 
     points_above = [p for p in points if orientation(p1, farthest, p) == 1]     #find the points above the line
-    points_below = [p for p in points if orientation(farthest, p2, p) == 1]     #find the points below the line
+    points_below = [p for p in points if orientation(farthest, p2, p) == 1 and orientation(p1, farthest, p) != 1]     #find the points below the line, once if rounding picked a farthest point that is not
     
     quickhull_recursive(convex_hull, points_above, p1, farthest)                #call the recursive function for the points above the line
     quickhull_recursive(convex_hull, points_below, farthest, p2)                #call the recursive function for the points below the line
 
+def convex_vertices(hull, turn):                                #drop hull points where the boundary does not make the turn
+    # The farthest point is picked by a rounded distance, so among nearly collinear points it
+    # can be one just inside the hull. One stack pass with the exact orientation() removes
+    # it again, starting from the smallest (x, y), which is always a hull point.
+    if len(hull) < 3:
+        return hull
+    start = hull.index(min(hull, key=lambda p: (p[0], p[1])))
+    hull = hull[start:] + hull[:start]
+    stack = []
+    for point in hull + hull[:1]:
+        while len(stack) > 1 and orientation(stack[-2], stack[-1], point) != turn:
+            stack.pop()
+        stack.append(point)
+    return stack[:-1]
+
 def quickhull_distance(p1, p2, p):                                              #distance between a point and a line
     return abs((p2[0] - p1[0]) * (p1[1] - p[1]) - (p1[0] - p[0]) * (p2[1] - p1[1]))             #calculate the distance between a point and a line
 
+def half_hull(xs, ys, candidates):                             #one monotone chain over candidates in sweep order
+    chain = []                                                  #indices of the chain so far
+    for i in candidates:
+        while len(chain) > 1:                                   #pop while the last two points and the current point do not turn counterclockwise
+            j, k = chain[-2], chain[-1]
+            left = (xs[k] - xs[j]) * (ys[i] - ys[j])
+            right = (ys[k] - ys[j]) * (xs[i] - xs[j])
+            cross = left - right
+            bound = ORIENTATION_ERROR * (left + right)          #same filter as orientation()
+            if cross > bound and cross > -bound:
+                break
+            if not (cross < bound and cross < -bound) and \
+                    orientation((xs[j], ys[j]), (xs[k], ys[k]), (xs[i], ys[i])) == 2:   #too close to call in floats
+                break
+            chain.pop()
+        chain.append(i)
+    return chain
+
+def as_point_array(points):                                    #Nx2 NumPy array of float64 or int64 coordinates
+    points = np.asarray(points).reshape(-1, 2)
+    if points.dtype.kind in "iub":
+        return points.astype(np.int64, copy=False)
+    return points.astype(np.float64, copy=False)
+
+def exact_coordinates(points):                                 #coordinates whose cross products cannot overflow
+    if points.dtype == np.int64 and len(points) and np.abs(points).max() >= 2**30:
+        return points.astype(object)                            #exact Python integers beyond the int64 range
+    return points
+
+def monotone_chain(points, prefilter_size=256):                #monotone chain algorithm on an Nx2 NumPy array
+    # Returns (hull indices, hull coordinates), counterclockwise from the point with the
+    # smallest (x, y), without collinear points. The sort is one np.lexsort and the
+    # cross products against the line between the two extreme points are vectorized, so
+    # each point only enters the stack loop of the chain it can belong to. From prefilter_size
+    # points on, the points inside the Akl-Toussaint octagon are dropped first, so on most
+    # inputs only a few go that far; below it the filter's fixed NumPy cost does not pay off.
+    points = as_point_array(points)
+    if len(points) >= max(prefilter_size, 3):
+        kept = octagon_survivors(points)
+        if len(kept) < len(points):                             #the survivors keep their order, so the same indices win ties
+            hull, _ = monotone_chain(points[kept])
+            return kept[hull], points[kept[hull]]
+    order = np.lexsort((points[:, 1], points[:, 0]))           #sort by x, then by y
+    if len(points) < 3:
+        keep = np.ones(len(order), dtype=bool)                  #drop duplicates
+        keep[1:] = np.any(points[order[1:]] != points[order[:-1]], axis=1)
+        return order[keep], points[order[keep]]
+
+    coordinates = exact_coordinates(points)
+    first, last = coordinates[order[0]], coordinates[order[-1]]
+    if first[0] == last[0] and first[1] == last[1]:             #all points are equal
+        return order[:1], points[order[:1]]
+    side = cross_products(first, last, (coordinates[order, 0], coordinates[order, 1]))
+    lower_candidates = order[side <= 0]                         #points on or below the line between the extreme points
+    upper_candidates = order[side >= 0][::-1]                   #points on or above it, from right to left
+
+    xs = coordinates[:, 0].tolist()                             #Python numbers keep the stack loop fast
+    ys = coordinates[:, 1].tolist()
+    lower = half_hull(xs, ys, lower_candidates.tolist())
+    upper = half_hull(xs, ys, upper_candidates.tolist())
+    hull = np.array(lower[:-1] + upper[:-1], dtype=np.int64)   #the extreme points close both chains
+    return hull, points[hull]
+
+def chain_between(xs, ys, p, q, candidates):                   #hull vertices strictly between p and q, counterclockwise
+    subset = sorted([p, q] + candidates, key=lambda i: (xs[i], ys[i]))     #small subproblem, so a plain monotone chain
+    lower = half_hull(xs, ys, subset)
+    upper = half_hull(xs, ys, subset[::-1])
+    hull = lower[:-1] + upper[:-1]                              #counterclockwise hull of the subset
+    start = hull.index(p)
+    hull = hull[start:] + hull[:start]                          #rotate so that the hull starts at p
+    return hull[1:hull.index(q)]
+
+def quickhull_numpy(points, leaf_size=256):                     #quickhull on an Nx2 NumPy array
+    # Same divide step as quickhull, but each partition is a NumPy boolean mask and the
+    # farthest point an argmin over one vectorized cross product. Pending edges sit on an
+    # explicit stack in output order, so the hull comes out counterclockwise without list
+    # insertion or recursion. Edges with at most leaf_size candidates are finished with a
+    # monotone chain. Returns (hull indices, hull coordinates) like monotone_chain.
+    points = as_point_array(points)
+    if len(points) < 3:
+        return monotone_chain(points)
+    coordinates = exact_coordinates(points)
+    xs = coordinates[:, 0]
+    ys = coordinates[:, 1]
+    column = np.flatnonzero(points[:, 0] == points[:, 0].min())
+    leftmost = int(column[np.argmin(points[column, 1])])       #smallest (x, y)
+    column = np.flatnonzero(points[:, 0] == points[:, 0].max())
+    rightmost = int(column[np.argmax(points[column, 1])])      #largest (x, y)
+    if leftmost == rightmost or (points[leftmost] == points[rightmost]).all():     #all points are equal
+        return np.array([leftmost]), points[[leftmost]]
+
+    def side(p, q, candidates):                                 #cross products of p->q with p->candidate, negative on the right
+        return cross_products((xs[p], ys[p]), (xs[q], ys[q]), (xs[candidates], ys[candidates]))
+
+    everything = np.arange(len(points))
+    sides = side(leftmost, rightmost, everything)
+    stack = [                                                   #popped from the end: lower chain, rightmost, upper chain
+        ("edge", rightmost, leftmost, everything[sides > 0]),
+        ("vertex", rightmost),
+        ("edge", leftmost, rightmost, everything[sides < 0]),
+    ]
+    hull = [leftmost]
+    xs_list = xs.tolist()
+    ys_list = ys.tolist()
+    while stack:
+        item = stack.pop()
+        if item[0] == "vertex":
+            hull.append(item[1])
+            continue
+        _, p, q, candidates = item
+        if len(candidates) == 0:
+            continue
+        if len(candidates) <= leaf_size:
+            hull.extend(chain_between(xs_list, ys_list, p, q, candidates.tolist()))
+            continue
+        sides = side(p, q, candidates)
+        farthest = candidates[sides == sides.min()]             #farthest points on the right of p->q
+        projections = (xs[q] - xs[p]) * (xs[farthest] - xs[p]) + (ys[q] - ys[p]) * (ys[farthest] - ys[p])
+        farthest = int(farthest[np.argmin(projections)])        #the tie nearest to p, so the others stay hull vertices
+        before = side(p, farthest, candidates) < 0
+        after = ~before & (side(farthest, q, candidates) < 0)   #a point right of both only if rounding missed the farthest
+        stack.append(("edge", farthest, q, candidates[after]))
+        stack.append(("vertex", farthest))
+        stack.append(("edge", p, farthest, candidates[before]))
+    hull = [(xs_list[i], ys_list[i], i) for i in hull]
+    hull = np.array([vertex[2] for vertex in convex_vertices(hull, 2)], dtype=np.int64)    #same clean-up as quickhull
+    return hull, points[hull]
+
+def orientations(p, q, r):                                      #orientation() over NumPy arrays
+    val = -cross_products(p, q, r)
+    return np.where(val == 0, 0, np.where(val > 0, 1, 2))
+
+def wraps_past(p, q, r):                                        #True where jarvis_march would take r over q after p
+    turn = orientations(p, q, r)
+    return (turn == 2) | ((turn == 0) & (distance(p, r) > distance(p, q)))
+
+def mini_hull_tangents(xs, ys, starts, sizes, p):               #jarvis_march tangent from p on every clockwise mini-hull
+    # Seen from p, moving to the next vertex is an improvement on one arc of a mini-hull and
+    # not on the other. Measured against vertex 0 that becomes a monotone predicate, so one
+    # binary search over all mini-hulls at once finds the first vertex where it flips.
+    def vertices(offsets):
+        rows = starts + offsets % sizes
+        return xs[rows], ys[rows]
+
+    first = vertices(np.zeros_like(sizes))
+    rising = wraps_past(p, first, vertices(np.ones_like(sizes)))   #is vertex 1 already better than vertex 0
+    low = np.ones_like(sizes)
+    high = sizes.copy()
+    while (low < high).any():
+        active = low < high
+        middle = np.minimum((low + high) // 2, sizes - 1)       #finished groups look at their last vertex, not vertex 0 again
+        current = vertices(middle)
+        improving = wraps_past(p, current, vertices(middle + 1))
+        side = orientations(p, first, current)
+        before = np.where(rising, improving & (side != 1), improving | (side != 2))
+        low = np.where(active & before, middle + 1, low)
+        high = np.where(active & ~before, middle, high)
+    return low % sizes
+
+def jarvis_choice(p, xs, ys, candidates):                       #the candidate jarvis_march would take after p
+    # Seen from a hull vertex every point lies in a cone narrower than a half turn, so float
+    # angles measured from the first candidate nearly always give the pick directly. It is
+    # kept only if no candidate wraps past it, which is exact; otherwise a knockout between
+    # pairs decides, as wraps_past orders the points by angle and then by distance.
+    dx = (xs[candidates] - p[0]).astype(np.float64)
+    dy = (ys[candidates] - p[1]).astype(np.float64)
+    angles = np.arctan2(dx[0] * dy - dy[0] * dx, dx[0] * dx + dy[0] * dy)
+    best = candidates[np.lexsort((dx * dx + dy * dy, angles))[-1]]
+    if not wraps_past(p, (xs[best], ys[best]), (xs[candidates], ys[candidates])).any():
+        return int(best)
+    while len(candidates) > 1:
+        a, b = candidates[0:-1:2], candidates[1::2]
+        winners = np.where(wraps_past(p, (xs[a], ys[a]), (xs[b], ys[b])), b, a)
+        candidates = np.append(winners, candidates[-1]) if len(candidates) % 2 else winners
+    return int(candidates[0])
+
+def chans_algorithm(points, group_size=4):                      #chan's algorithm, O(n log h)
+    # Returns the same hull as jarvis_march, clockwise from the leftmost point. The points are
+    # split into groups of m with a mini-hull each, all built by one grouped_hulls call, and
+    # every wrapping step takes one tangent per mini-hull instead of looking at all n points.
+    # If the hull has not closed after m steps, m is squared, the groups are rebuilt and the
+    # wrap carries on from the last vertex found. Once fewer than 8 groups would be left the
+    # last round takes one group, whose mini-hull is the hull; h > m then, so n log n is still
+    # O(n log h). Only the Akl-Toussaint survivors are grouped.
+    n = len(points)
+    if n < 3:
+        return points
+    survivors, _ = akl_toussaint(points)
+    point_list = survivors if isinstance(survivors, list) else [tuple(point) for point in survivors.tolist()]
+    coordinates = exact_coordinates(as_point_array(survivors))
+    n = len(point_list)
+    start = int(np.lexsort((coordinates[:, 1], coordinates[:, 0]))[0])    #leftmost point, lowest on ties
+
+    hull = [point_list[start]]
+    current = start                                             #row of the last hull vertex
+    m = min(group_size, n)
+    while True:
+        offsets, indices = grouped_hulls(coordinates, np.arange(n) // m)
+        starts, sizes = offsets[:-1], np.diff(offsets)
+        owner = np.repeat(starts, sizes)
+        rows = indices[owner + (owner - np.arange(len(indices))) % np.repeat(sizes, sizes)]   #each mini-hull clockwise from its smallest (x, y)
+        if len(sizes) == 1:                                     #one group: its mini-hull is the hull
+            return [point_list[row] for row in rows.tolist()]
+        xs, ys = coordinates[rows, 0], coordinates[rows, 1]
+        vertices = [point_list[row] for row in rows.tolist()]
+
+        group = current // m                                    #mini-hull and vertex of the current point
+        own = slice(starts[group], starts[group] + sizes[group])
+        vertex = int(np.flatnonzero((xs[own] == coordinates[current, 0]) & (ys[own] == coordinates[current, 1]))[0])
+        for _ in range(m):
+            position = int(starts[group]) + vertex
+            p = (xs[position], ys[position])
+            tangents = mini_hull_tangents(xs, ys, starts, sizes, p)
+            tangents[group] = (vertex + 1) % sizes[group]      #on its own mini-hull the tangent is the next vertex
+
+            # A tangent is right if neither neighbour would wrap past it. A duplicate of the
+            # current point in another group makes the search meaningless, so that group is
+            # scanned in full instead.
+            candidates = starts + tangents
+            neighbours = (starts + (tangents - 1) % sizes, starts + (tangents + 1) % sizes)
+            rescan = np.zeros(len(sizes), dtype=bool)
+            for row in neighbours:
+                rescan |= wraps_past(p, (xs[candidates], ys[candidates]), (xs[row], ys[row]))
+            for row in (candidates,) + neighbours:
+                rescan |= (xs[row] == p[0]) & (ys[row] == p[1])
+            rescan[group] = False
+            for g in np.flatnonzero(rescan).tolist():
+                others = np.arange(starts[g], starts[g] + sizes[g])
+                others = others[(xs[others] != p[0]) | (ys[others] != p[1])]
+                if len(others):
+                    candidates[g] = jarvis_choice(p, xs, ys, others)
+
+            best = jarvis_choice(p, xs, ys, candidates)         #the jarvis_march step over the tangents
+            if vertices[best] == point_list[start]:             #wrapped around to the leftmost point
+                return hull
+            hull.append(vertices[best])
+            current = int(rows[best])
+            group = int(np.searchsorted(starts, best, side="right")) - 1
+            vertex = best - int(starts[group])
+        m = m * m if 8 * m * m < n else n                       #more hull points than m, square the guess
+
+def octagon_survivors(points):                                  #indices of the points not strictly inside the octagon of extreme points
+    # The extremes in the x, y, x+y and x-y directions are input points, so their octagon lies
+    # inside the hull and nothing strictly inside it can be a hull point. Points on its edges
+    # are kept, so every algorithm still sees its own leftmost point and collinear ties.
+    coordinates = exact_coordinates(as_point_array(points))
+    xs, ys = np.ascontiguousarray(coordinates[:, 0]), np.ascontiguousarray(coordinates[:, 1])
+    sums, differences = xs + ys, xs - ys
+    extremes = [np.argmax(xs), np.argmax(sums), np.argmax(ys), np.argmin(differences),
+                np.argmin(xs), np.argmin(sums), np.argmin(ys), np.argmax(differences)]  #counterclockwise from the right
+    inside = np.ones(len(coordinates), dtype=bool)
+    exact = coordinates.dtype.kind != "f"
+    edges = 0
+    for a, b in zip(extremes, extremes[1:] + extremes[:1]):
+        ax, ay, bx, by = xs[a], ys[a], xs[b], ys[b]
+        if ax == bx and ay == by:                               #two directions share an extreme point
+            continue
+        np.subtract(ys, ay, out=sums)                           #the two halves of the cross product, in place
+        sums *= bx - ax
+        np.subtract(xs, ax, out=differences)
+        differences *= by - ay
+        if not exact:                                           #only drop points that are inside despite float rounding
+            differences += 2 * ORIENTATION_ERROR * (abs(bx - ax) * (ys[extremes[2]] - ys[extremes[6]]) +
+                                                    abs(by - ay) * (xs[extremes[0]] - xs[extremes[4]]))
+        inside &= sums > differences
+        edges += 1
+    if edges < 3:                                               #all points on a line, nothing is inside
+        inside[:] = False
+    return np.flatnonzero(~inside)
+
+def akl_toussaint(points):                                      #drop the points strictly inside the octagon of extreme points
+    kept = octagon_survivors(points)
+    if isinstance(points, list):
+        return [points[i] for i in kept.tolist()], len(points) - len(kept)
+    return np.asarray(points)[kept], len(points) - len(kept)
+
+def prefiltered_hull(points, algorithm=graham_scan):            #run a hull algorithm on the akl-toussaint survivors
+    survivors, removed = akl_toussaint(points)
+    return algorithm(survivors), removed
+
+
+class HullNode:                                                 #one subtree of a DynamicHull
+    __slots__ = ("left", "right", "point", "key", "high", "size", "upper", "lower")
+
+    def __init__(self, point=None, left=None, right=None):
+        self.left, self.right = left, right                     #both None on a leaf
+        self.point = point
+        self.key = self.high = None if point is None else (point[0], point[1])   #largest key on the left, largest key below
+        self.size = 1
+        self.upper = self.lower = None                          #bridge leaves joining the two children's chains
+
+
+class DynamicHull:                                              #convex hull of a point set that changes online
+    # Overmars-van Leeuwen style: the distinct points sit in the leaves of a search tree on
+    # (x, y), and every inner node keeps only the bridges that join the upper and lower chains
+    # of its two children. A bridge is found by descending both children in O(log^2 n), so an
+    # update costs O(log^3 n). The tree is kept balanced by rebuilding any subtree where one
+    # side holds more than balance of the points. Collinear points are left out of the hull.
+    def __init__(self, points=(), balance=0.75):
+        self.balance = balance
+        self.counts = {}                                        #points inserted more than once are stored once
+        self.root = None
+        self.chains = None                                      #lower and upper chains, rebuilt after updates
+        leaves = {}
+        for point in points:
+            key = (point[0], point[1])
+            self.counts[key] = self.counts.get(key, 0) + 1
+            leaves.setdefault(key, point)
+        if leaves:
+            self.root = self.build([HullNode(leaves[key]) for key in sorted(leaves)])
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def tangent(self, point, node, inside):                     #leaf of node's chain that point, on the left, sees last
+        while node.left is not None:
+            c, d = (node.upper if inside == 1 else node.lower)
+            node = node.left if orientation(point, c.point, d.point) == inside else node.right
+        return node
+
+    def bridge(self, node, inside):                             #leaves joining the chains of node's children
+        # inside is the orientation of a point strictly under the upper chain (1) or strictly
+        # over the lower chain (2). On collinear ties the outermost points are taken.
+        left = node.left
+        while left.left is not None:
+            a, b = (left.upper if inside == 1 else left.lower)
+            seen = self.tangent(a.point, node.right, inside)
+            left = left.right if orientation(a.point, seen.point, b.point) == 3 - inside else left.left
+        return left, self.tangent(left.point, node.right, inside)
+
+    def pull(self, node):                                       #recompute an inner node from its children
+        node.size = node.left.size + node.right.size
+        node.key, node.high = node.left.high, node.right.high
+        node.upper, node.lower = self.bridge(node, 1), self.bridge(node, 2)
+
+    def build(self, leaves):                                    #balanced subtree over leaves in key order
+        if len(leaves) == 1:
+            return leaves[0]
+        middle = len(leaves) // 2
+        node = HullNode(left=self.build(leaves[:middle]), right=self.build(leaves[middle:]))
+        self.pull(node)
+        return node
+
+    def leaves(self, node, out):
+        if node.left is None:
+            out.append(node)
+        else:
+            self.leaves(node.left, out)
+            self.leaves(node.right, out)
+        return out
+
+    def replace(self, parent, old, new):
+        if parent is None:
+            self.root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+
+    def repair(self, path):                                     #pull the nodes on a root-to-leaf path, then rebalance
+        for node in reversed(path):
+            self.pull(node)
+        for depth, node in enumerate(path):
+            if node.size > 3 and max(node.left.size, node.right.size) > self.balance * node.size:
+                self.replace(path[depth - 1] if depth else None, node, self.build(self.leaves(node, [])))
+                break                                           #the point set below is unchanged, so are the bridges above
+        self.chains = None
+
+    def insert(self, point):
+        key = (point[0], point[1])
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if self.counts[key] > 1:
+            return
+        leaf = HullNode(point)
+        if self.root is None:
+            self.root = leaf
+            self.chains = None
+            return
+        path, node = [], self.root
+        while node.left is not None:
+            path.append(node)
+            node = node.left if key <= node.key else node.right
+        pair = HullNode(left=leaf, right=node) if key < node.key else HullNode(left=node, right=leaf)
+        self.replace(path[-1] if path else None, node, pair)
+        self.repair(path + [pair])
+
+    def delete(self, point):
+        key = (point[0], point[1])
+        if key not in self.counts:
+            raise KeyError(point)
+        self.counts[key] -= 1
+        if self.counts[key]:
+            return
+        del self.counts[key]
+        path, node = [], self.root
+        while node.left is not None:
+            path.append(node)
+            node = node.left if key <= node.key else node.right
+        if not path:
+            self.root = None
+            self.chains = None
+            return
+        parent = path.pop()
+        self.replace(path[-1] if path else None, parent, parent.right if parent.left is node else parent.left)
+        self.repair(path)
+
+    def chain(self, node, inside, low, high, out):              #vertices of node's chain with keys in [low, high]
+        if node.left is None:
+            if low <= node.key <= high:
+                out.append(node)
+            return out
+        a, b = (node.upper if inside == 1 else node.lower)
+        if low <= a.key:
+            self.chain(node.left, inside, low, min(high, a.key), out)
+        if b.key <= high:
+            self.chain(node.right, inside, max(low, b.key), high, out)
+        return out
+
+    def hull(self):                                             #hull vertices counterclockwise from the leftmost point
+        if self.chains is None:
+            lower = upper = []
+            if self.root is not None:
+                bounds = ((-math.inf, -math.inf), (math.inf, math.inf))
+                lower = self.chain(self.root, 2, *bounds, [])
+                upper = self.chain(self.root, 1, *bounds, [])
+            self.chains = [([leaf.key for leaf in chain], [leaf.point for leaf in chain]) for chain in (lower, upper)]
+        lower, upper = self.chains[0][1], self.chains[1][1]
+        return lower + upper[-2:0:-1]
+
+    def contains(self, point):                                  #is a point inside or on the hull, O(log h) between updates
+        self.hull()
+        key = (point[0], point[1])
+        (lower_keys, lower), (upper_keys, upper) = self.chains
+        if not lower_keys or key < lower_keys[0] or key > lower_keys[-1]:
+            return False
+        for keys, chain, outside in ((lower_keys, lower, 1), (upper_keys, upper, 2)):
+            i = bisect.bisect_left(keys, key)
+            if keys[i] != key and orientation(chain[i - 1], chain[i], point) == outside:
+                return False
+        return True
+
+
+shared_block = None                                             #shared memory a hull worker has attached to
+shared_points = None                                            #point array a hull worker reads in place
+
+def share_points(points):                                       #copy points once into shared memory
+    # Returns (block, array). The array lives in the block, so hull workers attach to it by
+    # name instead of receiving pickled chunks. Close and unlink the block when done.
+    points = as_point_array(points)
+    block = shared_memory.SharedMemory(create=True, size=max(points.nbytes, 1))
+    shared = np.ndarray(points.shape, dtype=points.dtype, buffer=block.buf)
+    shared[:] = points
+    return block, shared
+
+def attach_shared_points(name, shape, dtype):                   #pool initializer: map the parent's points
+    global shared_points, shared_block
+    shared_block = shared_memory.SharedMemory(name=name)
+    shared_points = np.ndarray(shape, dtype=dtype, buffer=shared_block.buf)
+
+def can_fork():                                                 #whether worker processes can be forked (not on Windows)
+    return "fork" in multiprocessing.get_all_start_methods()
+
+def make_hull_pool(block, shared, processes=None):              #process pool whose workers see the shared points
+    context = multiprocessing.get_context("fork" if can_fork() else "spawn")   #workers attach by name, so spawn works too
+    return context.Pool(
+        processes, initializer=attach_shared_points, initargs=(block.name, shared.shape, shared.dtype.str))
+
+def chunk_hull(start, stop):                                    #hull of one chunk, as indices into the whole array
+    indices, _ = monotone_chain(shared_points[start:stop])
+    return indices + start
+
+def chunk_hulls(shared, pool, chunks=None):                     #indices of every chunk's hull points
+    chunks = chunks or 4 * multiprocessing.cpu_count()          #a few chunks per worker evens out the load
+    bounds = np.linspace(0, len(shared), chunks + 1).astype(np.int64)
+    return np.concatenate(pool.starmap(chunk_hull, zip(bounds[:-1].tolist(), bounds[1:].tolist())))
+
+def merge_hulls(shared, candidates):                            #hull of the union of the chunk hulls
+    indices, hull = monotone_chain(shared[candidates])
+    return candidates[indices], hull
+
+def parallel_hull(shared, pool, chunks=None):                   #monotone_chain over chunks of a shared point array
+    # Every worker runs monotone_chain on a slice of the shared array and sends back only the
+    # indices of its hull points, so neither the input nor the chunks are copied. The parent
+    # takes the hull of those few points. Returns (hull indices, hull coordinates).
+    return merge_hulls(shared, chunk_hulls(shared, pool, chunks))
+
+def parallel_report(points, max_processes=None):                #speedup of parallel_hull for 1 to N workers
+    block, shared = share_points(points)
+    try:
+        print("Workers  Chunk hulls (s)  Merge (ms)  Speedup")
+        single = None
+        for processes in range(1, (max_processes or multiprocessing.cpu_count()) + 1):
+            with make_hull_pool(block, shared, processes) as pool:
+                start = time.perf_counter()
+                candidates = chunk_hulls(shared, pool, 4 * processes)
+                local_time = time.perf_counter() - start
+                start = time.perf_counter()
+                merge_hulls(shared, candidates)
+                merge_time = time.perf_counter() - start
+            single = single or local_time + merge_time
+            print(f"{processes:<8} {local_time:<16.4f} {merge_time * 1000:<11.3f} {single / (local_time + merge_time):.2f}x")
+    finally:
+        del shared
+        block.close()
+        block.unlink()
+
+
+def memmap_chunks(path, chunk_size=1 << 20, dtype=np.float64):  #chunks of a raw binary file of (x, y) pairs
+    points = np.memmap(path, dtype=dtype, mode="r").reshape(-1, 2)
+    for start in range(0, len(points), chunk_size):
+        yield points[start:start + chunk_size]                  #a view, read from disk when it is used
+
+def point_chunks(points, chunk_size=1 << 16):                   #chunks of an iterable of (x, y) points
+    points = iter(points)
+    while True:
+        chunk = np.fromiter(itertools.islice(points, chunk_size), dtype=np.dtype((np.float64, 2)))
+        if not len(chunk):
+            return
+        yield chunk
+
+def streaming_hull(chunks):                                     #hull of a stream of point chunks
+    # Only the running hull and one chunk are held at a time. Each chunk is merged with the
+    # running hull through the Akl-Toussaint filter, which is all NumPy and removes almost
+    # every point once the hull has grown, so monotone_chain only sees the survivors.
+    # Returns the hull coordinates counterclockwise from the point with the smallest (x, y).
+    hull = None
+    for chunk in chunks:
+        chunk = as_point_array(chunk)
+        if hull is not None:
+            chunk = np.concatenate((hull, chunk))
+        if len(chunk) >= 3:
+            chunk, _ = akl_toussaint(chunk)
+        hull = monotone_chain(chunk)[1]
+    return np.zeros((0, 2)) if hull is None else hull
+
+def prune_chains(coordinates, chain, segments, rounds=64):      #drop chain points that do not turn counterclockwise
+    # A point on or right of the segment between its two neighbours in the chain is not a
+    # hull vertex, whatever happens to the neighbours, so one vectorized round drops every
+    # such point of every group at once. After the first round only the new neighbours of
+    # dropped points need another look. Returns (chain, segments, ids of the groups whose
+    # chains may still not be convex after the given number of rounds).
+    check = np.ones(len(chain), dtype=bool)                     #points whose turn may have changed
+    for _ in range(rounds):
+        candidates = np.flatnonzero(check[1:-1] & (segments[1:-1] == segments[:-2]) & (segments[1:-1] == segments[2:])) + 1
+        if not len(candidates):
+            return chain, segments, segments[:0]
+        previous, current, following = (coordinates[chain[candidates + k]] for k in (-1, 0, 1))
+        dropped = candidates[cross_products(previous.T, current.T, following.T) <= 0]
+        check = np.zeros(len(chain), dtype=bool)
+        check[dropped - 1] = check[dropped + 1] = True
+        keep = np.ones(len(chain), dtype=bool)
+        keep[dropped] = False
+        chain, segments, check = chain[keep], segments[keep], check[keep]
+    return chain, segments, np.unique(segments[check])
+
+def segment_bounds(segments):                                   #start of every run of equal segment ids, and the end
+    return np.flatnonzero(np.r_[True, segments[1:] != segments[:-1], True])
+
+def grouped_hulls(points, groups):                              #hulls of many small point groups in one call
+    # groups holds a non-negative integer group id per point. Returns (offsets, indices) in
+    # CSR form: the hull of group g is indices[offsets[g]:offsets[g + 1]], counterclockwise
+    # from its smallest (x, y) and without collinear points, as in monotone_chain; ids with
+    # no points get empty hulls. One np.lexsort orders all groups at once, and prune_chains
+    # cuts every lower and upper chain down together, so there is no Python call per group.
+    points = as_point_array(points)
+    groups = np.asarray(groups, dtype=np.int64).ravel()
+    num_groups = int(groups.max()) + 1 if len(groups) else 0
+    order = np.lexsort((points[:, 1], points[:, 0], groups))   #sort by group, then by x, then by y
+    keep = np.ones(len(order), dtype=bool)                      #drop duplicates within a group
+    segments, ordered = groups[order], points[order]
+    keep[1:] = (segments[1:] != segments[:-1]) | (ordered[1:, 0] != ordered[:-1, 0]) | (ordered[1:, 1] != ordered[:-1, 1])
+    order, segments = order[keep], segments[keep]
+
+    coordinates = exact_coordinates(points)
+    bounds = segment_bounds(segments)
+    sizes = np.diff(bounds)
+    first = coordinates[np.repeat(order[bounds[:-1]], sizes)]  #extreme points of every point's group
+    last = coordinates[np.repeat(order[bounds[1:] - 1], sizes)]
+    inner = np.ones(len(order), dtype=bool)                     #the extreme points themselves are on the line
+    inner[bounds[:-1]] = inner[bounds[1:] - 1] = False
+    side = np.zeros(len(order), dtype=coordinates.dtype)
+    side[inner] = cross_products(first[inner].T, last[inner].T, coordinates[order[inner]].T)
+
+    halves = []
+    for candidates in (side <= 0, side >= 0):                   #lower chains, then upper chains
+        chain, chain_segments = order[candidates], segments[candidates]
+        if halves:
+            chain, chain_segments = chain[::-1], chain_segments[::-1]  #upper chains run from right to left
+        chain, chain_segments, unfinished = prune_chains(coordinates, chain, chain_segments)
+        if len(unfinished):                                     #finish those groups with the stack loop of monotone_chain
+            xs = coordinates[:, 0].tolist()
+            ys = coordinates[:, 1].tolist()
+            stuck = np.isin(chain_segments, unfinished)
+            pieces = chain[stuck].tolist()
+            bounds = segment_bounds(chain_segments[stuck]).tolist()
+            finished = [i for start, stop in zip(bounds[:-1], bounds[1:]) for i in half_hull(xs, ys, pieces[start:stop])]
+            chain = np.concatenate((chain[~stuck], np.array(finished, dtype=np.int64)))
+            chain_segments = groups[chain]
+        bounds = segment_bounds(chain_segments)
+        keep = np.ones(len(chain), dtype=bool)                  #the last point of a chain starts the other one
+        keep[bounds[1:] - 1] = np.diff(bounds) == 1             #except in a group of one point
+        if halves:
+            keep[bounds[1:] - 1] = False
+        halves.append((chain[keep], chain_segments[keep]))
+
+    (lower, lower_segments), (upper, upper_segments) = halves
+    indices = np.concatenate((lower, upper))
+    keys = np.concatenate((2 * lower_segments, 2 * upper_segments + 1))  #each group's lower chain, then its upper chain
+    order = np.argsort(keys, kind="stable")
+    indices = indices[order]
+    offsets = np.zeros(num_groups + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys >> 1, minlength=num_groups), out=offsets[1:])
+    return offsets, indices
+
+def benchmark_points(distribution, n, rng):                     #n points of one benchmark input distribution
+    if distribution == "square":                                #uniform in the unit square
+        return rng.uniform(0, 1, (n, 2))
+    if distribution == "disk":                                  #uniform in the unit disk
+        radius, angle = np.sqrt(rng.uniform(0, 1, n)), rng.uniform(0, 2 * np.pi, n)
+        return np.column_stack((radius * np.cos(angle), radius * np.sin(angle)))
+    if distribution == "gaussian":
+        return rng.normal(0, 1, (n, 2))
+    if distribution == "circle":                                #every point on the hull, up to rounding
+        angle = rng.uniform(0, 2 * np.pi, n)
+        return np.column_stack((np.cos(angle), np.sin(angle)))
+    if distribution == "collinear":                             #integer points, many repeated and many on the hull edges
+        x = rng.integers(0, 1000, n)
+        y = np.where(rng.random(n) < 0.5, x, 1000 - x)          #on the two diagonals of the square
+        y[rng.random(n) < 0.25] = 0                             #or on its bottom edge
+        return np.column_stack((x, y))
+    raise ValueError(f"unknown distribution {distribution!r}")
+
+BENCHMARK_DISTRIBUTIONS = ["square", "disk", "gaussian", "circle", "collinear"]
+
+BENCHMARK_ALGORITHMS = {                                        #name: (function, True if it takes a list of tuples)
+    "Graham Scan": (graham_scan, True),
+    "Jarvis March": (jarvis_march, True),
+    "Quickhull": (quickhull, True),
+    "Monotone Chain": (lambda points: monotone_chain(points)[1], False),
+    "Quickhull (NumPy)": (lambda points: quickhull_numpy(points)[1], False),
+    "Chan": (chans_algorithm, True),
+}
+
+def hull_signature(hull):                                       #hull vertices sorted by (x, y), whatever the order or start
+    hull = np.asarray(hull, dtype=np.float64).reshape(-1, 2)
+    return hull[np.lexsort((hull[:, 1], hull[:, 0]))]
+
+class BenchmarkTimeout(Exception):                              #a benchmark run went past its time limit
+    pass
+
+def raise_benchmark_timeout(signum, frame):                     #SIGALRM handler of time_hull
+    raise BenchmarkTimeout()
+
+def time_hull(function, points, warmup, repeats, time_limit=None):
+    # Returns (hull, perf_counter times of the repeats). Where SIGALRM exists, a run that
+    # takes longer than time_limit seconds is interrupted with BenchmarkTimeout.
+    timed = time_limit is not None and hasattr(signal, "SIGALRM")
+    if timed:
+        previous_handler = signal.signal(signal.SIGALRM, raise_benchmark_timeout)
+    times = []
+    try:
+        for run in range(warmup + repeats):
+            if timed:
+                signal.setitimer(signal.ITIMER_REAL, time_limit)
+            start = time.perf_counter()
+            hull = function(points)
+            elapsed = time.perf_counter() - start
+            if timed:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+            if run >= warmup:
+                times.append(elapsed)
+    finally:
+        if timed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+    return hull, times
+
+def run_benchmark(sizes, distributions, algorithms, warmup=1, repeats=5, time_limit=10.0, seed=0):
+    # Times every algorithm on every distribution and size with perf_counter, after warmup
+    # runs, and checks each hull against the monotone chain's. A run that passes time_limit
+    # seconds is stopped, and an algorithm is skipped at a size once its last time, scaled
+    # up linearly, would pass it. Returns one dict per (distribution, size, algorithm).
+    results = []
+    for distribution in distributions:
+        last_times = {}                                         #algorithm: (size, median seconds)
+        for n in sizes:
+            points = benchmark_points(distribution, n, np.random.default_rng(seed))
+            point_list = None                                   #built only if a list algorithm still runs
+            reference = hull_signature(monotone_chain(points)[1])
+            for name in algorithms:
+                function, takes_list = BENCHMARK_ALGORITHMS[name]
+                record = {"distribution": distribution, "size": n, "algorithm": name, "status": "ok",
+                          "hull_size": None, "best": None, "median": None, "mean": None, "repeats": repeats}
+                if name in last_times and last_times[name][1] * n / last_times[name][0] > time_limit:
+                    record["status"] = "skipped"
+                    results.append(record)
+                    print(f"{distribution:<10} {n:>9} {name:<18} skipped")
+                    continue
+                if takes_list and point_list is None:
+                    point_list = list(map(tuple, points.tolist()))
+                try:
+                    hull, times = time_hull(function, point_list if takes_list else points, warmup, repeats, time_limit)
+                except BenchmarkTimeout:
+                    record["status"] = "timeout"
+                    last_times[name] = (n, math.inf)
+                    results.append(record)
+                    print(f"{distribution:<10} {n:>9} {name:<18} over {time_limit} s")
+                    continue
+                signature = hull_signature(hull)
+                if len(signature) != len(reference) or np.any(signature != reference):
+                    record["status"] = "mismatch"
+                record.update(hull_size=len(signature), best=min(times), median=float(np.median(times)),
+                              mean=sum(times) / len(times))
+                last_times[name] = (n, record["median"])
+                results.append(record)
+                print(f"{distribution:<10} {n:>9} {name:<18} {record['median']:.6f} s  h = {len(signature)}"
+                      + ("  MISMATCH" if record["status"] == "mismatch" else ""))
+    return results
+
+def write_benchmark(results, path, settings):                   #results as path.json and path.csv
+    with open(path + ".json", "w") as file:
+        json.dump({"settings": settings, "python": platform.python_version(), "numpy": np.__version__,
+                   "machine": platform.machine(), "results": results}, file, indent=2)
+    with open(path + ".csv", "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(results[0]) if results else ["distribution"])
+        writer.writeheader()
+        writer.writerows(results)
+
+def benchmark_arguments(arguments=None):                        #command line of the benchmark mode
+    parser = argparse.ArgumentParser(description="Convex hull examples, or a headless benchmark with --benchmark.")
+    parser.add_argument("--benchmark", action="store_true", help="run the benchmark instead of the examples and plots")
+    parser.add_argument("--sizes", nargs="+", type=lambda size: int(float(size)),
+                        default=[10**3, 10**4, 10**5, 10**6, 10**7], help="numbers of points, e.g. 1e3 1e4")
+    parser.add_argument("--distributions", nargs="+", choices=BENCHMARK_DISTRIBUTIONS, default=BENCHMARK_DISTRIBUTIONS)
+    parser.add_argument("--algorithms", nargs="+", choices=list(BENCHMARK_ALGORITHMS), default=list(BENCHMARK_ALGORITHMS))
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs before the timed ones")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per algorithm and input")
+    parser.add_argument("--time-limit", type=float, default=10.0, help="skip runs expected to take longer, in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="hull_benchmark", help="writes OUTPUT.json and OUTPUT.csv")
+    return parser.parse_args(arguments)
+
+# Command line benchmark mode: python "Convex Hull.py" --benchmark
+if __name__ == "__main__":                                      #importing the file must not read the importer's sys.argv
+    arguments = benchmark_arguments()
+    if arguments.benchmark:
+        benchmark_results = run_benchmark(arguments.sizes, arguments.distributions, arguments.algorithms,
+                                          arguments.warmup, arguments.repeats, arguments.time_limit, arguments.seed)
+        write_benchmark(benchmark_results, arguments.output, vars(arguments))
+        sys.exit(any(result["status"] == "mismatch" for result in benchmark_results))
 
 # Example inputs
 example_points = [
@@ -248,6 +1119,71 @@ start_time_quickhull = time.time()
 quickhull_hull = quickhull(points)
 quickhull_time = time.time() - start_time_quickhull
 
+# Monotone Chain on a NumPy array
+large_array = np.array(points)
+start_time_monotone = time.time()
+monotone_indices, monotone_hull = monotone_chain(large_array)
+monotone_time = time.time() - start_time_monotone
+
+# Quickhull on a NumPy array
+start_time_quickhull_numpy = time.time()
+quickhull_numpy_indices, quickhull_numpy_hull = quickhull_numpy(large_array)
+quickhull_numpy_time = time.time() - start_time_quickhull_numpy
+
+# Chan's algorithm
+start_time_chan = time.time()
+chan_hull = chans_algorithm(points)
+chan_time = time.time() - start_time_chan
+
+# Graham Scan, Jarvis March and Quickhull behind the Akl-Toussaint prefilter
+prefiltered_times = {}
+for name, algorithm in [("Graham Scan", graham_scan), ("Jarvis March", jarvis_march), ("Quickhull", quickhull)]:
+    start_time_prefiltered = time.time()
+    prefiltered, removed = prefiltered_hull(points, algorithm)
+    prefiltered_times[name] = time.time() - start_time_prefiltered
+print(f"Akl-Toussaint prefilter removed {removed} of {len(points)} points")
+for name, prefiltered_time in prefiltered_times.items():
+    print(f"{name} with prefilter: {prefiltered_time:.6f} seconds")
+
+# Dynamic hull: delete every hull vertex and insert it again
+dynamic_hull = DynamicHull(points)
+hull_vertices = dynamic_hull.hull()
+start_time_dynamic = time.time()
+for vertex in hull_vertices:
+    dynamic_hull.delete(vertex)
+for vertex in hull_vertices:
+    dynamic_hull.insert(vertex)
+dynamic_time = (time.time() - start_time_dynamic) / (2 * len(hull_vertices))
+print(f"Dynamic hull: {dynamic_time:.6f} seconds per update, {len(dynamic_hull.hull())} hull points")
+print("Dynamic hull contains (500, 500):", dynamic_hull.contains((500, 500)))
+
+# Parallel monotone chain over a million points in shared memory
+if multiprocessing.cpu_count() > 1 and can_fork():              #spawned workers would rerun this script
+    parallel_report(np.random.uniform(0, 1000, (1000000, 2)))
+
+# Streaming hull over a raw binary file of two million points
+with tempfile.TemporaryDirectory() as directory:
+    point_file = os.path.join(directory, "points.bin")
+    np.random.normal(500, 100, (2000000, 2)).tofile(point_file)
+    start_time_streaming = time.time()
+    streamed_hull = streaming_hull(memmap_chunks(point_file))
+    streaming_time = time.time() - start_time_streaming
+    print(f"Streaming hull: {len(streamed_hull)} hull points, "
+          f"{os.path.getsize(point_file) / streaming_time / 1e6:.1f} MB/s from a memory-mapped file")
+
+# Hulls of 20000 groups of 50 points in one call, against one monotone_chain call per group
+group_points = np.random.uniform(0, 1000, (1000000, 2))
+group_ids = np.repeat(np.arange(20000), 50)
+start_time_grouped = time.time()
+group_offsets, group_hull_indices = grouped_hulls(group_points, group_ids)
+grouped_time = time.time() - start_time_grouped
+start_time_per_group = time.time()
+for group in range(20000):
+    monotone_chain(group_points[50 * group:50 * (group + 1)])
+per_group_time = time.time() - start_time_per_group
+print(f"Grouped hulls: {grouped_time:.6f} seconds for 20000 groups, "
+      f"{per_group_time:.6f} seconds with one call per group, {len(group_hull_indices)} hull points")
+
 # Plot convex hull points for all algorithms
 x_graham, y_graham = zip(*graham_hull)              #x and y coordinates of the graham hull
 plt.plot(x_graham + (x_graham[0],), y_graham + (y_graham[0],), color='red', label='Graham Hull')
@@ -269,23 +1205,23 @@ plt.show()
 
 
 # Create a bar chart to compare execution times
-algorithms = ["Graham Scan", "Jarvis March", "Quickhull"]           
-times = [graham_time, jarvis_time, quickhull_time]
+algorithms = ["Graham Scan", "Jarvis March", "Quickhull", "Monotone Chain", "Quickhull (NumPy)", "Chan"]           
+times = [graham_time, jarvis_time, quickhull_time, monotone_time, quickhull_numpy_time, chan_time]
 
-plt.bar(algorithms, times, color=['red', 'green', 'purple'])
+plt.bar(algorithms, times, color=['red', 'green', 'purple', 'orange', 'blue', 'brown'])
 plt.xlabel('Algorithms')
 plt.ylabel('Execution Time (seconds)')
 plt.title('Execution Time Comparison for Convex Hull Algorithms')
 plt.show()
 
 # Print the slowest and the fastest algorithms
-algorithm_times = {"Graham Scan": graham_time, "Jarvis March": jarvis_time, "Quickhull": quickhull_time}
+algorithm_times = {"Graham Scan": graham_time, "Jarvis March": jarvis_time, "Quickhull": quickhull_time, "Monotone Chain": monotone_time, "Quickhull (NumPy)": quickhull_numpy_time, "Chan": chan_time}
 slowest_algorithm = max(algorithm_times, key=algorithm_times.get)
 fastest_algorithm = min(algorithm_times, key=algorithm_times.get)
 
 print("Algorithm Execution Times:")
-for algorithm, time in algorithm_times.items():
-    print(f"{algorithm}: {time:.6f} seconds")
+for algorithm, algorithm_time in algorithm_times.items():
+    print(f"{algorithm}: {algorithm_time:.6f} seconds")
 
 print()
 print(f"The slowest algorithm is {slowest_algorithm}.")         
@@ -1,5 +1,8 @@
 from intervaltree import Interval, IntervalTree
+import bisect
 import time
+import math
+import operator
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -138,6 +141,542 @@ class SegmentTree:
 
         average_time = np.mean(timings)
         return average_time
+
+# Python operations with the same result as each NumPy ufunc, for the scalar loops
+SCALAR_COMBINE = {np.add: operator.add, np.minimum: min, np.maximum: max}
+
+# Function to pick the identity of a built-in ufunc monoid for a dtype
+def default_identity(combine, dtype):
+    if combine is np.add:
+        return dtype.type(0).item()
+    if dtype.kind == "f":
+        return math.inf if combine is np.minimum else -math.inf
+    limits = np.iinfo(dtype)
+    return int(limits.max) if combine is np.minimum else int(limits.min)
+
+# Function to pick the node dtype of a typed tree: float64 for float input, int64 otherwise
+def node_dtype(arr, dtype=None):
+    if dtype is None:
+        return np.dtype(np.float64 if np.asarray(arr).dtype.kind == "f" else np.int64)
+    dtype = np.dtype(dtype)
+    if dtype.kind not in "iuf":
+        raise TypeError(f"segment tree nodes must be integers or floats, not {dtype}")
+    return dtype
+
+# Class to represent a segment tree stored bottom-up in a NumPy array of size 2n
+class ArraySegmentTree(SegmentTree):
+    # Leaf i sits at tree[n + i] and node k holds combine(tree[2k], tree[2k + 1]), so there is
+    # no recursion and no 4n padding. combine and identity form a monoid: np.add (the
+    # default), np.minimum and np.maximum run on a typed array, with every level of the build
+    # one ufunc call; any other associative Python function of two values works on an object
+    # array and needs its identity. The (node, start, end) arguments of the recursive class
+    # are accepted and ignored, so the measure_* methods time both engines the same way.
+    # The typed array is int64 or float64 from arr, and switches to float64 when a float
+    # value arrives later; an explicit dtype stays fixed and rejects values it cannot hold.
+    def __init__(self, arr, combine=np.add, identity=None, dtype=None):     # Constructor
+        self.arr = arr                                           # Store the input array
+        self.n = len(arr)                                        # Number of leaves
+        self.size = self.n                                       # Offset of the leaves in the node array
+        self.fixed_dtype = dtype is not None                     # Whether float values may promote the nodes
+        if combine in SCALAR_COMBINE:                            # Built-in monoid on a typed array
+            dtype = node_dtype(arr, dtype)
+            self.combine = combine
+            self.scalar_combine = SCALAR_COMBINE[combine]
+            self.identity = default_identity(combine, dtype) if identity is None else identity
+        elif identity is None:
+            raise ValueError("a custom combine function needs an identity")
+        else:                                                    # Custom monoid on Python objects
+            dtype = np.dtype(object)
+            self.combine = np.frompyfunc(combine, 2, 1)          # Still one call per level in build_tree
+            self.scalar_combine = combine
+            self.identity = identity
+        self.tree = np.empty(2 * self.size, dtype=dtype)         # Node array, node 0 is unused
+        self.tree.fill(self.identity)
+        self.cells = self.tree if dtype.kind == "O" else memoryview(self.tree)  # Faster to index from Python loops
+        self.build_tree(0, 0, self.n - 1)                        # Build the segment tree
+
+    # Function to build the segment tree one level at a time
+    def build_tree(self, node=0, start=0, end=None):
+        n = self.n
+        self.tree[n:] = self.as_leaves(self.arr)                # Copy the array into the leaves
+        high = n
+        while high > 1:                                         # Nodes [low, high) only have children at or past high
+            low = (high + 1) // 2
+            self.combine(self.tree[2 * low:2 * high:2], self.tree[2 * low + 1:2 * high:2], out=self.tree[low:high])
+            high = low
+        self.static, self.updated = None, False                 # No static table yet, no updates since the build
+        self.node_list = None                                   # No Python list copy of the nodes yet, see update
+
+    # Function to update one element and the nodes above it
+    def update(self, node, start, end, index, value):
+        # Scalar updates and queries run on a Python list copy of the nodes, which is much
+        # faster to index than the array; the first update after a build or a batch write
+        # makes it. Changed leaves are flagged, and sync() copies their paths back into the
+        # array before a vectorized method reads it. np.add is applied inline.
+        kind = self.tree.dtype.kind
+        if not (type(value) is int or kind == "f" and type(value) is float or kind == "O"):
+            self.fit_value(value)                               # Anything but a plain Python number is checked
+        nodes = self.node_list
+        if nodes is None:
+            nodes = self.node_list = self.tree.tolist()
+            self.changed = bytearray(self.n)                    # Leaves updated since the last sync
+        self.static, self.updated = None, True                  # The static table is out of date
+        self.arr[index] = value                                 # Update the array
+        self.changed[index] = 1
+        i = index + self.size
+        nodes[i] = value                                        # Update the leaf
+        if self.combine is np.add:
+            while i > 1:                                        # Walk up to the root
+                parent = i >> 1
+                nodes[parent] = nodes[i & ~1] + nodes[i | 1]    # Parent of i and its sibling
+                i = parent
+        else:
+            combine = self.scalar_combine
+            while i > 1:
+                parent = i >> 1
+                nodes[parent] = combine(nodes[i & ~1], nodes[i | 1])   # Left child first
+                i = parent
+
+    # Function to copy the nodes changed by scalar updates back into the node array
+    def sync(self):
+        if self.node_list is None:
+            return
+        changed = np.frombuffer(self.changed, dtype=np.uint8)
+        leaves = np.flatnonzero(changed)
+        if len(leaves) * self.n.bit_length() < self.n:         # Only the paths above the changed leaves
+            paths = np.unique(np.concatenate([(leaves + self.size) >> shift for shift in range(self.n.bit_length() + 1)]))
+            paths = paths[paths > 0]
+            nodes = self.node_list
+            self.tree[paths] = [nodes[k] for k in paths.tolist()]
+        else:
+            self.tree[:] = self.node_list
+        changed[:] = 0
+
+    # Function to check that the nodes can hold values of a dtype, promoting int nodes to float64
+    def fit_dtype(self, dtype):
+        if self.tree.dtype.kind == "O" or np.can_cast(dtype, self.tree.dtype, casting="same_kind"):
+            return
+        if dtype.kind != "f" or self.fixed_dtype:
+            raise TypeError(f"cannot store {dtype} values in a segment tree of {self.tree.dtype}")
+        self.promote()
+
+    # Function to check one value before it is stored, with Python numbers as the fast path
+    def fit_value(self, value):
+        kind = self.tree.dtype.kind
+        if kind != "O" and not (isinstance(value, int) or kind == "f" and isinstance(value, float)):
+            self.fit_dtype(np.asarray(value).dtype)
+
+    # Function to switch the node array to float64
+    def promote(self):
+        self.sync()
+        if self.identity == default_identity(self.combine, self.tree.dtype):   # Default identities follow the dtype
+            self.identity = default_identity(self.combine, np.dtype(np.float64))
+        self.tree = self.tree.astype(np.float64)
+        self.cells = memoryview(self.tree)
+        if isinstance(self.arr, np.ndarray):                    # Rebuilds must not truncate the new values
+            self.arr = self.arr.astype(np.float64)
+        self.static, self.node_list = None, None               # The list copy is rebuilt from the float nodes
+
+    # Function to turn a sequence of values into a 1-D array of the node type, see fit_dtype
+    def as_leaves(self, values):
+        if self.tree.dtype.kind == "O":                         # Keeps tuples and other sequences as single values
+            return np.fromiter(values, dtype=object, count=len(values))
+        values = np.asarray(values)
+        if values.size:                                         # An empty list is float64 but holds nothing to fit
+            self.fit_dtype(values.dtype)
+        return values.astype(self.tree.dtype, copy=False)
+
+    # Function to update many elements, recomputing their ancestors one level at a time
+    def update_many(self, indices, values):
+        indices = np.asarray(indices, dtype=np.int64)
+        self.sync()
+        leaves = self.as_leaves(values)                         # May promote the nodes and arr before anything is written
+        self.static, self.updated, self.node_list = None, True, None    # The static table and the list copy are out of date
+        if isinstance(self.arr, np.ndarray):                    # Update the array
+            self.arr[indices] = values
+        else:
+            for index, value in zip(indices.tolist(), values):
+                self.arr[index] = value
+        nodes = indices + self.size
+        self.tree[nodes] = leaves
+        while True:                                             # A node seen again later is recomputed after its children
+            nodes = np.unique(nodes[nodes > 1] >> 1)
+            if not len(nodes):
+                return
+            self.tree[nodes] = self.combine(self.tree[2 * nodes], self.tree[2 * nodes + 1])
+
+    # Function to query combine over arr[left..right], both ends included
+    def query(self, node, start, end, left, right):
+        cells = self.cells if self.node_list is None else self.node_list    # The list is ahead after scalar updates
+        combine = self.scalar_combine
+        left_result = right_result = self.identity              # Kept apart, so combine need not commute
+        left = max(left, 0) + self.size                         # Leaf range [left, right)
+        right = min(right, self.n - 1) + 1 + self.size
+        while left < right:
+            if left & 1:                                        # left is a right child, take it and move past it
+                left_result = combine(left_result, cells[left])
+                left += 1
+            if right & 1:                                       # right - 1 is a left child, take it
+                right -= 1
+                right_result = combine(cells[right], right_result)
+            left >>= 1
+            right >>= 1
+        return combine(left_result, right_result)
+
+    # Function to make an array of count copies of the identity
+    def identities(self, count):
+        results = np.empty(count, dtype=self.tree.dtype)
+        results.fill(self.identity)
+        return results
+
+    # Function to answer a batch of queries, combine over arr[lefts[i]..rights[i]] for every i
+    def query_many(self, lefts, rights, mode=None):
+        # mode "static" answers from prefix sums (np.add) or a sparse table (np.minimum,
+        # np.maximum) with O(1) gathers per query; "tree" walks the tree for all queries at
+        # once, one vectorized step per level. By default the static table is used while the
+        # array has not been updated since the build, and rebuilt after updates only when the
+        # batch is large enough to pay for it. Prefix sums of floats round like any long sum.
+        self.sync()
+        lefts = np.maximum(np.asarray(lefts, dtype=np.int64), 0)
+        rights = np.minimum(np.asarray(rights, dtype=np.int64), self.n - 1)
+        empty = lefts > rights
+        if mode is None:
+            mode = "tree"
+            if self.combine in SCALAR_COMBINE and self.n > 1:
+                static_cost = self.n if self.combine is np.add else self.n * math.log2(self.n)
+                if self.static is not None or not self.updated or len(lefts) * math.log2(self.n) >= static_cost:
+                    mode = "static"
+        if mode == "static" and self.n:
+            if self.static is None:
+                self.static = self.build_static()
+            results = self.static_query(np.where(empty, 0, lefts), np.where(empty, 0, rights))
+        else:
+            results = self.tree_query_many(lefts, rights)
+        results[empty] = self.identities(np.count_nonzero(empty))
+        return results
+
+    # Function to build prefix sums or a sparse table over the leaves
+    def build_static(self):
+        leaves = self.tree[self.size:self.size + self.n]
+        if self.combine is np.add:
+            return np.concatenate((np.zeros(1, dtype=leaves.dtype), np.cumsum(leaves)))
+        if self.combine not in SCALAR_COMBINE:
+            raise ValueError("static mode needs np.add, np.minimum or np.maximum")
+        levels, span = [leaves], 1                              # Level k holds combine over arr[i..i + 2^k - 1]
+        while 2 * span <= self.n:
+            levels.append(self.combine(levels[-1][:-span], levels[-1][span:]))
+            span *= 2
+        offsets = np.cumsum([0] + [len(level) for level in levels[:-1]])
+        return np.concatenate(levels), offsets
+
+    # Function to answer non-empty queries from the static table in O(1) each
+    def static_query(self, lefts, rights):
+        if self.combine is np.add:
+            return self.static[rights + 1] - self.static[lefts]
+        table, offsets = self.static
+        levels = np.frexp(rights - lefts + 1)[1] - 1            # Largest k with 2^k <= length
+        starts = offsets[levels]
+        return self.combine(table[starts + lefts], table[starts + rights - (1 << levels) + 1])   # Two overlapping halves
+
+    # Function to walk the tree for a whole batch of queries at once
+    def tree_query_many(self, lefts, rights):
+        left_results, right_results = self.identities(len(lefts)), self.identities(len(lefts))
+        left = lefts + self.size                                # Leaf ranges [left, right)
+        right = rights + 1 + self.size
+        while True:
+            active = left < right
+            if not active.any():
+                return self.combine(left_results, right_results)
+            take = active & (left & 1 == 1)                     # left is a right child, take it and move past it
+            left_results[take] = self.combine(left_results[take], self.tree[left[take]])
+            left += take
+            take = active & (right & 1 == 1)                    # right - 1 is a left child, take it
+            right -= take
+            right_results[take] = self.combine(self.tree[right[take]], right_results[take])
+            left >>= 1
+            right >>= 1
+
+    def measure_query_many_time(self, num_iterations, lefts, rights, mode=None):    # Time one query_many call over all the ranges
+        timings = []
+
+        for _ in range(num_iterations):
+            start_time = time.time()
+            self.query_many(lefts, rights, mode)
+            end_time = time.time()
+            timings.append(end_time - start_time)
+
+        average_time = np.mean(timings)
+        return average_time
+
+# Class to represent a segment tree with lazy range-assign and range-add
+class LazySegmentTree(ArraySegmentTree):
+    # The leaves are padded to a power of two, so node k covers size >> (depth of k) leaves.
+    # An internal node may carry a pending tag, "assign v, then add a", for its children;
+    # its own value already includes the tag. Range operations tag the O(log n) nodes that
+    # cover the range, after pushing the tags on the two boundary paths down, so they cost
+    # O(log n) however wide the range is. Range operations do not write back to self.arr.
+    def __init__(self, arr, dtype=None):                         # Constructor
+        self.arr = arr                                           # Store the input array
+        self.n = len(arr)                                        # Number of leaves in use
+        self.size = 1 << max(self.n - 1, 0).bit_length()         # Padded number of leaves
+        self.height = self.size.bit_length() - 1                 # Levels above the leaves
+        self.fixed_dtype = dtype is not None                     # Whether float values may promote the nodes
+        dtype = node_dtype(arr, dtype)
+        self.combine, self.scalar_combine, self.identity = np.add, operator.add, 0      # Range sums only
+        self.tree = np.zeros(2 * self.size, dtype=dtype)         # Node values, node 0 is unused
+        self.assigned = np.zeros(self.size, dtype=dtype)         # Pending assignment of each internal node
+        self.has_assigned = np.zeros(self.size, dtype=bool)      # Whether that assignment is set
+        self.added = np.zeros(self.size, dtype=dtype)            # Pending addition, applied after the assignment
+        self.cells = memoryview(self.tree)
+        self.assigned_cells = memoryview(self.assigned)
+        self.has_assigned_cells = memoryview(self.has_assigned)
+        self.added_cells = memoryview(self.added)
+        self.build_tree(0, 0, self.n - 1)                        # Build the segment tree
+
+    # Function to build the segment tree one level at a time and clear the pending tags
+    def build_tree(self, node=0, start=0, end=None):
+        size = self.size
+        self.tree[size:size + self.n] = self.arr                # Copy the array into the leaves
+        self.tree[size + self.n:] = 0                           # Padding leaves add nothing
+        for level in range(self.height - 1, -1, -1):
+            low, high = 1 << level, 2 << level
+            np.add(self.tree[2 * low:2 * high:2], self.tree[2 * low + 1:2 * high:2], out=self.tree[low:high])
+        self.has_assigned[:] = False
+        self.added[:] = 0
+        self.static, self.updated, self.node_list = None, False, None     # Scalar updates here go through the tags, never a list copy
+
+    # Function to switch the nodes and the pending tags to float64
+    def promote(self):
+        super().promote()
+        self.assigned = self.assigned.astype(np.float64)
+        self.added = self.added.astype(np.float64)
+        self.assigned_cells = memoryview(self.assigned)
+        self.added_cells = memoryview(self.added)
+
+    # Function to number the leaves under node k
+    def width(self, k):
+        return self.size >> (k.bit_length() - 1)
+
+    # Function to assign value to every leaf under node k
+    def apply_assign(self, k, value):
+        self.cells[k] = value * self.width(k)
+        if k < self.size:
+            self.assigned_cells[k] = value
+            self.has_assigned_cells[k] = True
+            self.added_cells[k] = 0                             # The assignment replaces earlier additions
+
+    # Function to add value to every leaf under node k
+    def apply_add(self, k, value):
+        self.cells[k] += value * self.width(k)
+        if k < self.size:
+            self.added_cells[k] += value
+
+    # Function to hand the pending tag of node k down to its children
+    def push(self, k):
+        if self.has_assigned_cells[k]:
+            self.apply_assign(2 * k, self.assigned_cells[k])
+            self.apply_assign(2 * k + 1, self.assigned_cells[k])
+            self.has_assigned_cells[k] = False
+        if self.added_cells[k]:
+            self.apply_add(2 * k, self.added_cells[k])
+            self.apply_add(2 * k + 1, self.added_cells[k])
+            self.added_cells[k] = 0
+
+    # Function to push the tags on the path from the root down to a leaf
+    def push_path(self, leaf):
+        for shift in range(self.height, 0, -1):
+            self.push(leaf >> shift)
+
+    # Function to recompute the nodes on the path from a leaf up to the root
+    def pull_path(self, leaf):
+        cells = self.cells
+        k = leaf >> 1
+        while k:
+            if self.has_assigned_cells[k]:                      # A pending tag still decides the node's value
+                cells[k] = (self.assigned_cells[k] + self.added_cells[k]) * self.width(k)
+            else:
+                cells[k] = cells[2 * k] + cells[2 * k + 1] + self.added_cells[k] * self.width(k)
+            k >>= 1
+
+    # Function to apply an assignment or an addition to arr[left..right], both ends included
+    def range_apply(self, apply, left, right, value):
+        left = max(left, 0) + self.size                         # Leaf range [left, right)
+        right = min(right, self.n - 1) + 1 + self.size
+        if left >= right:
+            return
+        self.fit_value(value)
+        first, last = left, right - 1
+        self.static, self.updated = None, True                  # The static table is out of date
+        self.push_path(first)                                   # No tag above the range may be pending
+        self.push_path(last)
+        while left < right:                                     # Tag the nodes that cover the range
+            if left & 1:
+                apply(left, value)
+                left += 1
+            if right & 1:
+                right -= 1
+                apply(right, value)
+            left >>= 1
+            right >>= 1
+        self.pull_path(first)
+        self.pull_path(last)
+
+    # Function to set arr[left..right] to value
+    def range_assign(self, left, right, value):
+        self.range_apply(self.apply_assign, left, right, value)
+
+    # Function to add value to arr[left..right]
+    def range_add(self, left, right, value):
+        self.range_apply(self.apply_add, left, right, value)
+
+    # Function to update one element and the nodes above it
+    def update(self, node, start, end, index, value):
+        self.fit_value(value)
+        self.static, self.updated = None, True
+        self.arr[index] = value                                 # Update the array
+        leaf = index + self.size
+        self.push_path(leaf)
+        self.cells[leaf] = value
+        self.pull_path(leaf)
+
+    # Function to query the sum of arr[left..right], both ends included
+    def query(self, node, start, end, left, right):
+        if max(left, 0) <= min(right, self.n - 1):
+            self.push_path(max(left, 0) + self.size)            # The nodes read below must be up to date
+            self.push_path(min(right, self.n - 1) + self.size)
+        return super().query(node, start, end, left, right)
+
+    # Function to push every pending tag down to the leaves, one level at a time
+    def push_all(self):
+        for level in range(self.height):
+            low, high = 1 << level, 2 << level
+            width = self.size >> (level + 1)                    # Leaves under each child
+            nodes = np.flatnonzero(self.has_assigned[low:high]) + low       # Assignments first, as in push()
+            for children in (2 * nodes, 2 * nodes + 1):
+                self.tree[children] = self.assigned[nodes] * width
+                if width > 1:                                   # Internal children take over the tag
+                    self.assigned[children] = self.assigned[nodes]
+                    self.has_assigned[children] = True
+                    self.added[children] = 0
+            nodes = np.flatnonzero(self.added[low:high]) + low
+            for children in (2 * nodes, 2 * nodes + 1):
+                self.tree[children] += self.added[nodes] * width
+                if width > 1:
+                    self.added[children] += self.added[nodes]
+            self.has_assigned[low:high] = False
+            self.added[low:high] = 0
+
+    # Function to answer a batch of range-sum queries after pushing the pending tags down
+    def query_many(self, lefts, rights, mode=None):
+        self.push_all()
+        return super().query_many(lefts, rights, mode)
+
+    def measure_deletion_time(self, intervals, num_iterations):                 # Same deletions, one range_assign per run of consecutive starts
+        starts = np.unique([interval[0] for interval in intervals])
+        runs = np.split(starts, np.flatnonzero(np.diff(starts) != 1) + 1)       # Runs of consecutive indices
+        runs = [(int(run[0]), int(run[-1])) for run in runs if len(run)]
+        timings = []
+
+        for _ in range(num_iterations):
+            start_time = time.time()
+            self.build_tree(0, 0, len(intervals) - 1)                           # Build the segment tree
+            for left, right in runs:
+                self.range_assign(left, right, 0)                               # Set the whole run to 0 at once
+            end_time = time.time()
+            timings.append(end_time - start_time)
+
+        average_time = np.mean(timings)
+        return average_time
+
+    def measure_range_add_time(self, num_iterations, ranges, value):            # Time range_add over (left, right) pairs
+        timings = []
+
+        for _ in range(num_iterations):
+            start_time = time.time()
+            for left, right in ranges:
+                self.range_add(left, right, value)                              # Shift the whole range by value
+            end_time = time.time()
+            timings.append(end_time - start_time)
+
+        average_time = np.mean(timings)
+        return average_time
+
+# Class to represent a segment tree of intervals for stabbing queries
+class StabbingSegmentTree:
+    # Intervals are half-open [begin, end) like intervaltree's. The sorted distinct endpoints
+    # cut the line into elementary slots [x_j, x_j+1), which are the leaves of a bottom-up
+    # tree of size 2m. Each interval is stored in the O(log m) nodes that exactly cover its
+    # slots, so the intervals containing a point are those stored on the path from the
+    # point's slot to the root: O(log m + k) to report them, and O(log m) to count them.
+    def __init__(self, intervals):                               # Constructor
+        self.intervals = [interval for interval in intervals if interval[0] < interval[1]]   # Empty intervals contain no point
+        begins = np.array([interval[0] for interval in self.intervals], dtype=np.float64)
+        ends = np.array([interval[1] for interval in self.intervals], dtype=np.float64)
+        self.coordinates = np.unique(np.concatenate((begins, ends)))     # Compressed endpoints
+        self.coordinate_list = self.coordinates.tolist()        # For bisect in single queries
+        self.size = max(len(self.coordinates) - 1, 0)           # Number of slots
+        self.nodes = [[] for _ in range(2 * self.size)]         # Intervals stored in each node, node 0 is unused
+
+        # Canonical nodes of every interval, found for all intervals at once
+        left = np.searchsorted(self.coordinates, begins) + self.size     # Slot range [left, right) of each interval
+        right = np.searchsorted(self.coordinates, ends) + self.size
+        ids = np.arange(len(self.intervals))
+        found_nodes, found_ids = [], []
+        while True:
+            active = left < right
+            if not active.any():
+                break
+            take = active & (left & 1 == 1)                     # left is a right child, store the interval there
+            found_nodes.append(left[take])
+            found_ids.append(ids[take])
+            left += take
+            take = active & (right & 1 == 1)                    # right - 1 is a left child
+            right -= take
+            found_nodes.append(right[take])
+            found_ids.append(ids[take])
+            left >>= 1
+            right >>= 1
+        found_nodes = np.concatenate(found_nodes) if found_nodes else np.zeros(0, dtype=np.int64)
+        found_ids = np.concatenate(found_ids) if found_ids else np.zeros(0, dtype=np.int64)
+        for node, interval_id in zip(found_nodes.tolist(), found_ids.tolist()):
+            self.nodes[node].append(self.intervals[interval_id])
+
+        # Number of intervals stored on the path from each node to the root
+        self.path_counts = np.bincount(found_nodes, minlength=2 * self.size)
+        depth = 1
+        while depth < 2 * self.size:                            # Parents of [depth, 2 depth) are in [depth / 2, depth)
+            stop = min(2 * depth, 2 * self.size)
+            self.path_counts[depth:stop] += self.path_counts[np.arange(depth, stop) >> 1]
+            depth *= 2
+        self.path_count_list = self.path_counts.tolist()
+
+    # Function to find the leaf of the slot holding point, or 0 if no interval reaches it
+    def leaf(self, point):
+        slot = bisect.bisect_right(self.coordinate_list, point) - 1
+        return slot + self.size if 0 <= slot < self.size else 0
+
+    # Function to report every interval containing point
+    def at(self, point):
+        result = []
+        node = self.leaf(point)
+        while node:                                             # Walk up to the root
+            if self.nodes[node]:
+                result.extend(self.nodes[node])
+            node >>= 1
+        return result
+
+    # Function to count the intervals containing point without listing them
+    def count(self, point):
+        node = self.leaf(point)
+        return self.path_count_list[node] if node else 0
+
+    # Function to count the intervals containing each of many points
+    def count_many(self, points):
+        slots = np.searchsorted(self.coordinates, np.asarray(points, dtype=np.float64), side="right") - 1
+        inside = (slots >= 0) & (slots < self.size)
+        counts = np.zeros(len(slots), dtype=np.int64)
+        counts[inside] = self.path_counts[slots[inside] + self.size]
+        return counts
    
 # Function to measure interval tree build time
 def measure_interval_tree_build_performance(interval_list, num_iterations):
@@ -240,7 +779,7 @@ def measure_query_point_performance(tree, query_points, num_iterations):   # num
     for _ in range(num_iterations):
         start_time = time.time()
         for query_point in query_points:   # query points are the midpoints of the intervals
-            result = tree.overlap(query_point, query_point)
+            result = tree.at(query_point)   # overlap(point, point) is an empty range and always returns the empty set
         end_time = time.time() # Measure end time
         
         elapsed_time = end_time - start_time # Calculate the elapsed time
@@ -249,6 +788,22 @@ def measure_query_point_performance(tree, query_points, num_iterations):   # num
     average_time = np.mean(timings)
     return average_time
 
+# Function to measure count-only stabbing queries on a stabbing segment tree
+def measure_stabbing_count_performance(tree, query_points, num_iterations):
+    timings = []
+
+    for _ in range(num_iterations):
+        start_time = time.time()
+        for query_point in query_points:
+            count = tree.count(query_point)    # Number of intervals containing the point
+        end_time = time.time()
+
+        elapsed_time = end_time - start_time
+        timings.append(elapsed_time)
+
+    average_time = np.mean(timings)
+    return average_time
+
 # Number of intervals to test
 num_intervals = [100, 500, 1000, 2000, 5000, 10000]
 
@@ -259,6 +814,7 @@ delete_timings = []                     # List to store deletion timings
 interval_update_timings = []            # List to store interval tree update timings
 query_overlap_timings = []              # List to store query overlap timings
 query_point_timings = []                # List to store query point timings
+stabbing_query_timings = []             # List to store stabbing segment tree query point timings
 expected_timings = []                   # List to store expected O(log N) timings
 interval_tree_build = []                # List to store interval tree build timings
 segment_tree_build_timings = []         # List to store segment tree build timings
@@ -266,6 +822,9 @@ segment_tree_insert_timings = []        # List to store segment tree insertion t
 segment_tree_query_timings = []         # List to store segment tree query timings
 segment_tree_deletion_timings = []      # List to store segment tree query timings
 update_timings = []                     # List to store segment tree update timings
+array_tree_timings = {"Build": [], "Insertion": [], "Deletion": [], "Query": [], "Update": []}   # Timings of the ArraySegmentTree engine
+lazy_deletion_timings = []              # List to store lazy segment tree range deletion timings
+lazy_range_add_timings = []             # List to store lazy segment tree range add timings
 
 
 
@@ -309,6 +868,42 @@ for num in num_intervals:
     update_timings.append(update_time)
     print(f"Segment Tree Update time for {num} intervals: {update_time:.6f} seconds")
 
+    # Measure the same operations on the array-backed engine
+    array_segment_tree = ArraySegmentTree([0] * num)
+    array_tree_timings["Build"].append(array_segment_tree.measure_build_time(num_iterations))
+    array_tree_timings["Insertion"].append(array_segment_tree.measure_insertion_time(num_iterations))
+    array_tree_timings["Deletion"].append(array_segment_tree.measure_deletion_time(intervals, num_iterations))
+    array_tree_timings["Query"].append(array_segment_tree.measure_query_time(num_iterations, query_ranges))
+    array_tree_timings["Update"].append(array_segment_tree.measure_update_time(num_iterations, indices, values))
+    for operation, timings in array_tree_timings.items():
+        print(f"Array Segment Tree {operation} time for {num} elements: {timings[-1]:.6f} seconds")
+
+    # Measure range deletion and a shift of the whole array on the lazy engine
+    lazy_segment_tree = LazySegmentTree([0] * num)
+    lazy_deletion_time = lazy_segment_tree.measure_deletion_time(intervals, num_iterations)
+    lazy_deletion_timings.append(lazy_deletion_time)
+    print(f"Lazy Segment Tree Deletion time for {num} intervals: {lazy_deletion_time:.6f} seconds")
+    lazy_range_add_time = lazy_segment_tree.measure_range_add_time(num_iterations, [(0, num - 1)], 1)
+    lazy_range_add_timings.append(lazy_range_add_time)
+    print(f"Lazy Segment Tree Range Add time for {num} elements: {lazy_range_add_time:.6f} seconds")
+
+    # Measure min, max and argmax trees on the array engine
+    monoid_trees = {"Min": ArraySegmentTree(list(range(num)), np.minimum),
+                    "Max": ArraySegmentTree(list(range(num)), np.maximum),
+                    "Argmax": ArraySegmentTree([(i % 97, i) for i in range(num)], max, (-math.inf, -1))}   # Custom combiner on (value, index) pairs
+    for name, monoid_tree in monoid_trees.items():
+        monoid_build_time = monoid_tree.measure_build_time(num_iterations)
+        monoid_query_time = monoid_tree.measure_query_time(num_iterations, query_ranges)
+        print(f"{name} Segment Tree Build time for {num} elements: {monoid_build_time:.6f} seconds, Query time: {monoid_query_time:.6f} seconds")
+
+    # Measure the same queries as one batch, from the static table and from the tree
+    lefts = np.arange(num)
+    rights = lefts + 1
+    for name, batch_tree in [("Sum", array_segment_tree), ("Min", monoid_trees["Min"])]:
+        static_time = batch_tree.measure_query_many_time(num_iterations, lefts, rights, "static")
+        tree_time = batch_tree.measure_query_many_time(num_iterations, lefts, rights, "tree")
+        print(f"{name} Segment Tree Batch Query time for {num} queries: {static_time:.6f} seconds static, {tree_time:.6f} seconds tree")
+
     # Measure interval tree build performance
     interval_tree_build_time = measure_interval_tree_build_performance(intervals, num_iterations)
     print(f"Interval Tree Build time for {num} intervals: {interval_tree_build_time:.6f} seconds")
@@ -342,6 +937,20 @@ for num in num_intervals:
     query_point_time = measure_query_point_performance(tree, query_points, num_iterations)      # Measure query performance
     query_point_timings.append(query_point_time)
     print(f"Query Point time for {num} intervals: {query_point_time:.6f} seconds")
+
+    # Measure the stabbing segment tree on the same intervals and query points
+    start_time = time.time()
+    stabbing_tree = StabbingSegmentTree(intervals)
+    stabbing_build_time = time.time() - start_time
+    stabbing_query_time = measure_query_point_performance(stabbing_tree, query_points, num_iterations)     # Same measurement as the interval tree
+    stabbing_count_time = measure_stabbing_count_performance(stabbing_tree, query_points, num_iterations)
+    start_time = time.time()
+    stabbing_tree.count_many(query_points)
+    stabbing_batch_count_time = time.time() - start_time
+    stabbing_query_timings.append(stabbing_query_time)
+    print(f"Stabbing Segment Tree Build time for {num} intervals: {stabbing_build_time:.6f} seconds")
+    print(f"Stabbing Segment Tree Query Point time for {num} intervals: {stabbing_query_time:.6f} seconds, "
+          f"count only: {stabbing_count_time:.6f} seconds, batch count: {stabbing_batch_count_time:.6f} seconds")
     
     # Calculate the expected O(log N) time
     expected_time = np.log2(num) * (insert_time + delete_time) / (2 * np.log2(2))
@@ -355,6 +964,7 @@ plt.plot(num_intervals, insert_timings, marker='o', label='Insertion')
 plt.plot(num_intervals, delete_timings, marker='o', label='Deletion')
 plt.plot(num_intervals, query_overlap_timings, marker='o', label='Query Overlap')
 plt.plot(num_intervals, query_point_timings, marker='o', label='Query Point')
+plt.plot(num_intervals, stabbing_query_timings, marker='x', linestyle='dotted', label='Query Point (Stabbing Segment Tree)')
 plt.plot(num_intervals, expected_timings, linestyle='dashed', label='Expected O(log N)')
 plt.plot(num_intervals, interval_tree_build, marker='o', label='Build')
 plt.plot(num_intervals, interval_update_timings, marker='o', label='Update')
@@ -378,6 +988,10 @@ plt.plot(num_intervals, segment_tree_query_timings, marker='o', label='Segment T
 plt.plot(num_intervals, segment_tree_insert_timings, marker='o', label='Segment Tree Insertion')
 plt.plot(num_intervals, segment_tree_deletion_timings, marker='o', label='Segment Tree Deletion')
 plt.plot(num_intervals, update_timings, marker='o', label='Segment Tree Update')
+plt.plot(num_intervals, array_tree_timings["Build"], marker='x', linestyle='dotted', label='Array Segment Tree Build')
+plt.plot(num_intervals, array_tree_timings["Query"], marker='x', linestyle='dotted', label='Array Segment Tree Query')
+plt.plot(num_intervals, lazy_deletion_timings, marker='x', linestyle='dotted', label='Lazy Segment Tree Deletion')
+plt.plot(num_intervals, lazy_range_add_timings, marker='x', linestyle='dotted', label='Lazy Segment Tree Range Add')
 plt.plot(num_intervals, expected_timings, linestyle='dashed', label='Expected O(log N) Build')
 plt.xlabel('Number of Elements')
 plt.ylabel('Time (seconds)')